@@ -14,6 +14,7 @@ import rich.traceback  # type: ignore
 import semver  # type: ignore
 
 import gdbt
+import gdbt.code
 import gdbt.code.configuration
 import gdbt.code.templates
 import gdbt.errors
@@ -76,7 +77,14 @@ def version() -> None:
     default=False,
     help="Update evaluation lock",
 )
-def validate(scope: str, update: bool) -> None:
+@click.option(
+    "--no-render-cache",
+    type=click.BOOL,
+    is_flag=True,
+    default=False,
+    help="Render all resources without using the render cache",
+)
+def validate(scope: str, update: bool, no_render_cache: bool) -> None:
     """Validate the configuration"""
     try:
         check_for_updates()
@@ -88,11 +96,14 @@ def validate(scope: str, update: bool) -> None:
 
             spinner.text = "Loading configuration"
             configuration = gdbt.code.configuration.load(path_current)
-            templates = gdbt.code.templates.load(path_current)
+            templates = gdbt.code.templates.load(
+                path_current, configuration.concurrency.processes
+            )
 
             spinner.text = "Resolving resources"
-            for name, template in templates.items():
-                template.resolve(name, configuration, str(path_base), update)
+            gdbt.code.RenderEngine(
+                configuration, str(path_base), update, not no_render_cache
+            ).resolve(templates)
 
             spinner.succeed(
                 rich.style.Style(color="green", bold=True).render(
@@ -120,7 +131,20 @@ def validate(scope: str, update: bool) -> None:
     default=False,
     help="Update evaluation lock",
 )
-def plan(scope: str, update: bool) -> None:
+@click.option(
+    "--no-render-cache",
+    type=click.BOOL,
+    is_flag=True,
+    default=False,
+    help="Render all resources without using the render cache",
+)
+@click.option(
+    "--refresh",
+    type=click.Choice(["full", "inventory"]),
+    default="full",
+    help="Refresh mode: fetch all dashboards or only ones changed since last apply",
+)
+def plan(scope: str, update: bool, no_render_cache: bool, refresh: str) -> None:
     """Plan the changes"""
     try:
         check_for_updates()
@@ -133,16 +157,14 @@ def plan(scope: str, update: bool) -> None:
 
             spinner.text = "Loading configuration"
             configuration = gdbt.code.configuration.load(path_current)
-            templates = gdbt.code.templates.load(path_current)
+            templates = gdbt.code.templates.load(
+                path_current, configuration.concurrency.processes
+            )
 
             spinner.text = "Resolving resources"
-            resources_desired = {
-                name: typing.cast(
-                    gdbt.resource.ResourceGroup,
-                    template.resolve(name, configuration, str(path_base), update),
-                )
-                for name, template in templates.items()
-            }
+            resources_desired = gdbt.code.RenderEngine(
+                configuration, str(path_base), update, not no_render_cache
+            ).resolve(templates)
 
             spinner.text = "Loading resource state"
             states = gdbt.state.StateLoader(configuration).load(path_relative)
@@ -152,7 +174,8 @@ def plan(scope: str, update: bool) -> None:
 
             spinner.text = "Refreshing resource state"
             resources_current = gdbt.resource.ResourceLoader(configuration).load(
-                resources_current_meta
+                resources_current_meta,
+                resources_desired if refresh == "inventory" else None,
             )
 
             spinner.text = "Calculating plan"
@@ -204,7 +227,22 @@ def plan(scope: str, update: bool) -> None:
     default=False,
     help="Update evaluation lock",
 )
-def apply(scope: str, auto_approve: bool, update: bool) -> None:
+@click.option(
+    "--no-render-cache",
+    type=click.BOOL,
+    is_flag=True,
+    default=False,
+    help="Render all resources without using the render cache",
+)
+@click.option(
+    "--refresh",
+    type=click.Choice(["full", "inventory"]),
+    default="full",
+    help="Refresh mode: fetch all dashboards or only ones changed since last apply",
+)
+def apply(
+    scope: str, auto_approve: bool, update: bool, no_render_cache: bool, refresh: str
+) -> None:
     """Apply the changes"""
     try:
         check_for_updates()
@@ -217,16 +255,14 @@ def apply(scope: str, auto_approve: bool, update: bool) -> None:
 
             spinner.text = "Loading configuration"
             configuration = gdbt.code.configuration.load(path_current)
-            templates = gdbt.code.templates.load(path_current)
+            templates = gdbt.code.templates.load(
+                path_current, configuration.concurrency.processes
+            )
 
             spinner.text = "Resolving resources"
-            resources_desired = {
-                name: typing.cast(
-                    gdbt.resource.ResourceGroup,
-                    template.resolve(name, configuration, str(path_base), update),
-                )
-                for name, template in templates.items()
-            }
+            resources_desired = gdbt.code.RenderEngine(
+                configuration, str(path_base), update, not no_render_cache
+            ).resolve(templates)
 
             spinner.text = "Loading resource state"
             states = gdbt.state.StateLoader(configuration).load(path_relative)
@@ -236,7 +272,8 @@ def apply(scope: str, auto_approve: bool, update: bool) -> None:
 
             spinner.text = "Refreshing resource state"
             resources_current = gdbt.resource.ResourceLoader(configuration).load(
-                resources_current_meta
+                resources_current_meta,
+                resources_desired if refresh == "inventory" else None,
             )
 
             spinner.text = "Calculating plan"
@@ -269,14 +306,16 @@ def apply(scope: str, auto_approve: bool, update: bool) -> None:
         with halo.Halo(text="Loading", spinner="dots") as spinner:
             spinner.text = "Applying changes"
             t_start = time.time()
-            gdbt.state.PlanRunner(summary).apply(
-                configuration, resources_current, resources_desired
-            )
-
-            spinner.text = "Uploading resource state"
-            gdbt.state.StateLoader(configuration).upload(
-                path_relative, resources_desired
-            )
+            runner = gdbt.state.PlanRunner(summary)
+            try:
+                runner.apply(configuration, resources_current, resources_desired)
+            finally:
+                # Record only the changes that were applied, even if some failed
+                spinner.text = "Uploading resource state"
+                gdbt.state.StateLoader(configuration).upload(
+                    path_relative,
+                    runner.resources_applied(resources_current, resources_desired),
+                )
             t_end = time.time()
             duration = t_end - t_start
             spinner.succeed(
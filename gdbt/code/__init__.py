@@ -1,5 +1,6 @@
 from .configuration import Configuration
+from .render import RenderEngine
 from .templates import Template, TemplateLoader
 
-# Export Configuration and Template classes
-__all__ = ["Configuration", "Template", "TemplateLoader"]
+# Export Configuration, RenderEngine and Template classes
+__all__ = ["Configuration", "RenderEngine", "Template", "TemplateLoader"]
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import pathlib
+import typing
+
+import attr
+
+import gdbt
+import gdbt.errors
+from gdbt.files import write_atomic
+from gdbt.provider import Provider
+
+LIBRARY_DIRECTORY = "macros"
+USER_CACHE_DIRECTORY = "gdbt"
+RENDER_CACHE_DIRECTORY = ".gdbt/render"
+RENDER_CACHE_SIZE = 256
+DEFINITION_CACHE_FILE = ".gdbt/definitions.json"
+DEFINITION_CACHE_FORMAT = 4
+
+
+def user_cache_path() -> pathlib.Path:
+    """Per-user cache directory, outside of any configuration repository"""
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    path = pathlib.Path(base) / USER_CACHE_DIRECTORY
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return path
+
+
+@attr.s
+class RenderCache:
+    base: str = attr.ib()
+    size: int = attr.ib(default=RENDER_CACHE_SIZE)
+    _library: typing.Optional[str] = attr.ib(init=False, default=None)
+
+    @property
+    def path(self) -> pathlib.Path:
+        path = pathlib.Path(self.base) / RENDER_CACHE_DIRECTORY
+        return path
+
+    @property
+    def library(self) -> str:
+        if self._library is not None:
+            return self._library
+        library_hash = hashlib.sha256()
+        library_path = pathlib.Path(self.base) / LIBRARY_DIRECTORY
+        if library_path.is_dir():
+            for file in sorted(library_path.glob("**/*")):
+                if not file.is_file():
+                    continue
+                library_hash.update(str(file.relative_to(library_path)).encode())
+                library_hash.update(file.read_bytes())
+        self._library = library_hash.hexdigest()
+        return self._library
+
+    def digest(
+        self,
+        model: typing.Any,
+        evaluations: typing.Mapping[str, typing.Any],
+        lookups: typing.Mapping[str, typing.Any],
+        providers: typing.Mapping[str, Provider],
+        options: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    ) -> str:
+        data = {
+            "version": gdbt.__version__,
+            "library": self.library,
+            "model": model,
+            "options": options or {},
+            "evaluations": evaluations,
+            "lookups": lookups,
+            "providers": {
+                name: attr.asdict(provider) if attr.has(type(provider)) else None
+                for name, provider in providers.items()
+            },
+        }
+        digest_hash = hashlib.sha256()
+        digest_hash.update(json.dumps(data, sort_keys=True, default=str).encode())
+        digest = digest_hash.hexdigest()
+        return digest
+
+    @staticmethod
+    def key(digest: str, item: typing.Optional[typing.Any] = None) -> str:
+        key_hash = hashlib.sha256()
+        key_hash.update(digest.encode())
+        key_hash.update(json.dumps(item, sort_keys=True, default=str).encode())
+        key = key_hash.hexdigest()
+        return key
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        path = self.path / key[:2] / f"{key}.json"
+        return path
+
+    def get(self, key: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        path = self._entry_path(key)
+        try:
+            with open(path, "r") as f_cache:
+                model = json.load(f_cache)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return model
+
+    def put(self, key: str, model: typing.Dict[str, typing.Any]) -> None:
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, json.dumps(model, separators=(",", ":")))
+        except PermissionError as exc:
+            raise gdbt.errors.FileAccessDenied(str(exc))
+
+    def prune(self) -> None:
+        if not self.path.is_dir():
+            return
+        entries = []
+        for path in self.path.glob("*/*.json"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size_limit = self.size * 1024 * 1024
+        size_total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if size_total <= size_limit:
+                break
+            path.unlink(missing_ok=True)
+            size_total -= size
+
+
+@attr.s
+class DefinitionCache:
+    base: str = attr.ib()
+    _entries: typing.Dict[str, typing.Tuple[int, int, typing.Any]] = attr.ib(
+        init=False, factory=dict
+    )
+    _changed: bool = attr.ib(init=False, default=False)
+
+    @property
+    def path(self) -> pathlib.Path:
+        path = pathlib.Path(self.base) / DEFINITION_CACHE_FILE
+        return path
+
+    @staticmethod
+    def signature(file: pathlib.Path) -> typing.Tuple[int, int]:
+        stat = file.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r") as f_cache:
+                cache = json.load(f_cache)
+            version = cache["version"]
+            cache_format = cache["format"]
+            entries = {
+                str(file): (int(mtime), int(size), data)
+                for file, (mtime, size, data) in cache["entries"].items()
+            }
+        except (OSError, KeyError, TypeError, ValueError):
+            return
+        if version != gdbt.__version__ or cache_format != DEFINITION_CACHE_FORMAT:
+            return
+        self._entries = entries
+
+    def get(self, file: pathlib.Path) -> typing.Optional[typing.Any]:
+        try:
+            mtime, size, data = self._entries[str(file)]
+        except KeyError:
+            return None
+        if (mtime, size) != self.signature(file):
+            return None
+        return data
+
+    def put(self, file: pathlib.Path, data: typing.Any) -> None:
+        try:
+            json.dumps(data)
+        except (TypeError, ValueError):
+            # Definitions with values JSON can't represent are parsed every time
+            return
+        mtime, size = self.signature(file)
+        self._entries.update({str(file): (mtime, size, data)})
+        self._changed = True
+
+    def dump(self) -> None:
+        for file in list(self._entries):
+            if not pathlib.Path(file).is_file():
+                del self._entries[file]
+                self._changed = True
+        if not self._changed:
+            return
+        cache = {
+            "version": gdbt.__version__,
+            "format": DEFINITION_CACHE_FORMAT,
+            "entries": self._entries,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.path, json.dumps(cache, separators=(",", ":")))
+        except PermissionError as exc:
+            raise gdbt.errors.FileAccessDenied(str(exc))
+        self._changed = False
@@ -15,6 +15,7 @@ import envtoml  # type: ignore
 
 import gdbt.errors
 from gdbt.provider import Provider
+from gdbt.provider.grafana import GrafanaProvider
 
 CONFIG_FILENAME = "config.toml"
 
@@ -24,6 +25,11 @@ class Configuration:
     providers: typing.Dict[str, Provider] = attr.ib()
     state: "StateConfiguration" = attr.ib()
     concurrency: "ConcurrencyConfiguration" = attr.ib()
+    cache: typing.Optional["CacheConfiguration"] = attr.ib(default=None)
+    retry: typing.Optional["RetryConfiguration"] = attr.ib(default=None)
+    # Retry budgets and circuit breakers for the run (gdbt.resource.retry.Retrier),
+    # created on first use. Not a type hint, deserialize resolves those at runtime
+    retrier: typing.Optional[typing.Any] = attr.ib(default=None, eq=False, repr=False)
 
 
 @attr.s
@@ -38,6 +44,55 @@ class StateConfiguration:
 class ConcurrencyConfiguration:
     threads: typing.Optional[int] = attr.ib(default=100)
     timeout: typing.Optional[float] = attr.ib(default=60.0)
+    processes: typing.Optional[int] = attr.ib(default=None)
+    phases: typing.Optional[typing.Dict[str, int]] = attr.ib(default=None)
+    providers: typing.Optional[typing.Dict[str, typing.Dict[str, int]]] = attr.ib(
+        default=None
+    )
+
+    def provider_budget(self, phase: str, provider: str) -> typing.Optional[int]:
+        provider_budgets = (self.providers or {}).get(provider) or {}
+        budget = provider_budgets.get(phase) or provider_budgets.get("threads")
+        return budget
+
+    def budget(self, phase: str, provider: typing.Optional[str] = None) -> int:
+        if provider is not None:
+            budget = self.provider_budget(phase, provider)
+            if budget:
+                return budget
+        budget = (self.phases or {}).get(phase) or self.threads or 100
+        return budget
+
+    def budgets(self, phase: str) -> typing.Dict[str, int]:
+        budgets = {}
+        for provider in self.providers or {}:
+            budget = self.provider_budget(phase, provider)
+            if budget:
+                budgets.update({provider: budget})
+        return budgets
+
+
+@attr.s
+class CacheConfiguration:
+    render_size: typing.Optional[int] = attr.ib(default=None)
+    evaluation_ttl: typing.Optional[int] = attr.ib(default=None)
+    evaluation_provider: typing.Optional[str] = attr.ib(default=None)
+
+
+@deserialize.default("max_time", 60.0)
+@deserialize.default("refresh_max_time", 30.0)
+@deserialize.default("budget", 20)
+@deserialize.default("budget_ratio", 0.1)
+@deserialize.default("breaker_threshold", 5)
+@deserialize.default("breaker_timeout", 30.0)
+@attr.s
+class RetryConfiguration:
+    max_time: typing.Optional[float] = attr.ib(default=60.0)
+    refresh_max_time: typing.Optional[float] = attr.ib(default=30.0)
+    budget: typing.Optional[int] = attr.ib(default=20)
+    budget_ratio: typing.Optional[float] = attr.ib(default=0.1)
+    breaker_threshold: typing.Optional[int] = attr.ib(default=5)
+    breaker_timeout: typing.Optional[float] = attr.ib(default=30.0)
 
 
 @attr.s
@@ -76,6 +131,9 @@ class ConfigurationLoader:
             configuration = deserialize.deserialize(
                 Configuration, configuration_data.as_attrdict()
             )
+            for provider in configuration.providers.values():
+                if isinstance(provider, GrafanaProvider) and not provider.pool_size:
+                    provider.pool_size = configuration.concurrency.threads
         except (
             TypeError,
             envtoml.toml.TomlDecodeError,
@@ -0,0 +1,194 @@
+import concurrent.futures
+import multiprocessing
+import os
+import typing
+
+import attr
+
+import gdbt.errors
+from gdbt.code.cache import RenderCache
+from gdbt.code.configuration import Configuration
+from gdbt.code.templates import Template
+from gdbt.dynamic import (
+    EvaluationCache,
+    EvaluationEngine,
+    LocalEvaluationCacheBackend,
+    StateEvaluationCacheBackend,
+)
+from gdbt.provider import StateProvider
+from gdbt.resource import ResourceGroup
+
+RENDER_CHUNK_SIZE = 64
+
+RenderUnit = typing.Tuple[
+    str,
+    Template,
+    typing.Dict[str, typing.Any],
+    typing.Dict[str, typing.Any],
+    typing.List[typing.Any],
+]
+RenderedModels = typing.List[typing.Tuple[str, typing.Dict[str, typing.Any]]]
+RenderKeys = typing.List[str]
+
+_worker_configuration: typing.Optional[Configuration] = None
+_worker_base: typing.Optional[str] = None
+
+
+def _initialize_worker(configuration: Configuration, base: str) -> None:
+    global _worker_configuration, _worker_base
+    _worker_configuration = configuration
+    _worker_base = base
+
+
+def _render_unit(unit: RenderUnit) -> RenderedModels:
+    name, template, evaluations, lookups, items = unit
+    configuration = typing.cast(Configuration, _worker_configuration)
+    models = template.render(
+        name, evaluations, lookups, configuration, items, base=_worker_base
+    )
+    return models
+
+
+@attr.s
+class RenderEngine:
+    configuration: Configuration = attr.ib()
+    base: str = attr.ib()
+    update: bool = attr.ib(default=False)
+    cache: bool = attr.ib(default=True)
+
+    @property
+    def render_cache(self) -> typing.Optional[RenderCache]:
+        if not self.cache:
+            return None
+        cache_configuration = self.configuration.cache
+        if cache_configuration and cache_configuration.render_size is not None:
+            return RenderCache(self.base, cache_configuration.render_size)
+        return RenderCache(self.base)
+
+    @property
+    def evaluation_cache(self) -> EvaluationCache:
+        cache_configuration = self.configuration.cache
+        if not cache_configuration or not cache_configuration.evaluation_provider:
+            return EvaluationCache(LocalEvaluationCacheBackend(self.base))
+        try:
+            provider = self.configuration.providers[
+                cache_configuration.evaluation_provider
+            ]
+        except KeyError:
+            raise gdbt.errors.ProviderNotFound(
+                cache_configuration.evaluation_provider
+            ) from None
+        if not isinstance(provider, StateProvider):
+            raise gdbt.errors.ConfigError(
+                "cache.evaluation_provider must be a state storage provider"
+            )
+        return EvaluationCache(StateEvaluationCacheBackend(provider))
+
+    @property
+    def evaluation_ttl(self) -> typing.Optional[int]:
+        cache_configuration = self.configuration.cache
+        if not cache_configuration:
+            return None
+        return cache_configuration.evaluation_ttl
+
+    @property
+    def processes(self) -> int:
+        processes = self.configuration.concurrency.processes or os.cpu_count() or 1
+        return processes
+
+    @staticmethod
+    def chunk(
+        items: typing.Sequence[typing.Any], size: int = RENDER_CHUNK_SIZE
+    ) -> typing.Generator[typing.List[typing.Any], None, None]:
+        for start in range(0, len(items), size):
+            end = start + size
+            yield list(items[start:end])
+
+    def plan(
+        self,
+        templates: typing.Mapping[str, Template],
+        cache: typing.Optional[RenderCache] = None,
+    ) -> typing.Tuple[
+        typing.Dict[str, RenderedModels],
+        typing.List[RenderUnit],
+        typing.List[RenderKeys],
+    ]:
+        models: typing.Dict[str, RenderedModels] = {}
+        units = []
+        keys = []
+        engine = EvaluationEngine(
+            self.configuration.providers,
+            self.base,
+            self.configuration.concurrency.budget("evaluation"),
+            self.update,
+            self.evaluation_cache,
+            self.evaluation_ttl,
+            self.configuration.concurrency.budgets("evaluation"),
+        )
+        evaluations_resolved = engine.resolve(
+            {name: template.evaluations or {} for name, template in templates.items()}
+        )
+        for name, template in templates.items():
+            evaluations = evaluations_resolved[name]
+            lookups = template.resolve_lookups(self.base)
+            items = list(template.resolve_loops(evaluations, lookups))
+            models.update({name: []})
+            items_pending = []
+            digest = ""
+            if cache:
+                digest = cache.digest(
+                    template.model,
+                    evaluations,
+                    lookups,
+                    self.configuration.providers,
+                    template.render_options,
+                )
+            for item in items:
+                key = cache.key(digest, item) if cache else ""
+                model = cache.get(key) if cache else None
+                if model is None:
+                    items_pending.append((item, key))
+                    continue
+                models[name].append((template.resource_name(name, item), model))
+            for chunk in self.chunk(items_pending):
+                units.append(
+                    (name, template, evaluations, lookups, [item for item, _ in chunk])
+                )
+                keys.append([key for _, key in chunk])
+        return models, units, keys
+
+    def render(self, units: typing.Sequence[RenderUnit]) -> typing.List[RenderedModels]:
+        items_count = sum(len(unit[-1]) for unit in units)
+        processes = min(self.processes, len(units))
+        if processes <= 1 or items_count <= RENDER_CHUNK_SIZE:
+            _initialize_worker(self.configuration, self.base)
+            return [_render_unit(unit) for unit in units]
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(
+            processes,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(self.configuration, self.base),
+        ) as pool:
+            results = list(pool.map(_render_unit, units))
+        return results
+
+    def resolve(
+        self, templates: typing.Mapping[str, Template]
+    ) -> typing.Dict[str, ResourceGroup]:
+        cache = self.render_cache
+        models, units, keys = self.plan(templates, cache)
+        results = self.render(units)
+        for unit, unit_keys, result in zip(units, keys, results):
+            models[unit[0]].extend(result)
+            if not cache:
+                continue
+            for key, (_, model) in zip(unit_keys, result):
+                cache.put(key, model)
+        if cache:
+            cache.prune()
+        resources = {
+            name: typing.cast(ResourceGroup, templates[name].build(models[name]))
+            for name in templates
+        }
+        return resources
@@ -1,24 +1,53 @@
 import abc
+import collections
+import concurrent.futures
+import copy
+import functools
 import hashlib
 import json
+import multiprocessing
+import os
 import pathlib
+import re
+import threading
 import typing
+import uuid
 
 import attr
 import config
 import deserialize  # type: ignore
+import dpath.exceptions  # type: ignore
+import dpath.segments  # type: ignore
 import dpath.util  # type: ignore
 import jinja2
+import jinja2.nodes
 import yaml
 
 import gdbt.errors
+from gdbt.code.cache import (
+    LIBRARY_DIRECTORY,
+    DefinitionCache,
+    RenderCache,
+    user_cache_path,
+)
 from gdbt.code.configuration import Configuration, ConfigurationLoader
-from gdbt.dynamic import Evaluation, EvaluationLock, Lookup
-from gdbt.provider import EvaluationProvider
+from gdbt.dynamic import Evaluation, EvaluationEngine, Lookup, resolve_lookup
 from gdbt.resource import Resource
 
 TEMPLATE_VARIABLE_DELIMITER_LEFT = "{$"
 TEMPLATE_VARIABLE_DELIMITER_RIGHT = "$}"
+TEMPLATE_CACHE_SIZE = 512
+TEMPLATE_BYTECODE_DIRECTORY = "jinja"
+ITERATOR_GLOB_CHARACTERS = ("*", "?", "[")
+TEMPLATE_EXPRESSION = re.compile(r"\{\$((?:(?!\$\}).)*)\$\}", re.DOTALL)
+TEMPLATE_MARKERS = (TEMPLATE_VARIABLE_DELIMITER_LEFT, "{%", "{#")
+LOOP_INVARIANT = "invariant"
+LOOP_ITEM_OUTPUT = "item"
+LOOP_DEPENDENT = "dependent"
+MODEL_FORMAT_JSON = "json"
+MODEL_FORMAT_STRUCTURED = "structured"
+TEMPLATE_LOAD_CHUNK_SIZE = 32
+YAML_LOADER = getattr(yaml, "CFullLoader", yaml.FullLoader)
 
 
 @deserialize.downcast_field("kind")
@@ -33,43 +62,64 @@ class Template(abc.ABC):
         factory=typing.cast(typing.Any, dict)
     )
     loop: typing.Optional[str] = attr.ib()
-    model: str = attr.ib()
+    format: typing.Optional[str] = attr.ib(default=MODEL_FORMAT_JSON)
+    model: typing.Any = attr.ib()
 
     @abc.abstractmethod
     def make_resource(
         self,
         grafana: str,
         uid: str,
-        model: str,
+        model: typing.Dict[str, typing.Any],
     ) -> Resource:
         pass
 
+    def parse_model(self, model: str) -> typing.Dict[str, typing.Any]:
+        model_dict = json.loads(model)
+        return model_dict
+
+    @property
+    def evaluations_grouped(self) -> typing.FrozenSet[str]:
+        grouped = frozenset(
+            name
+            for name, evaluation in (self.evaluations or {}).items()
+            if evaluation.grouped
+        )
+        return grouped
+
+    @property
+    def render_options(self) -> typing.Dict[str, typing.Any]:
+        # Everything besides the model and its inputs that changes the output
+        options = {
+            "kind": self.kind,
+            "format": self.format or MODEL_FORMAT_JSON,
+            "grouped": sorted(self.evaluations_grouped),
+        }
+        return options
+
     def resolve_vars(
         self, configuration: Configuration, base: str, name: str, update: bool = False
     ) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Dict[str, typing.Any]]:
-        try:
-            evaluations_resolved = {}
-            lock = EvaluationLock(base, name)
-            for evaluation_name, evaluation in (self.evaluations or {}).items():
-                evaluation_source = typing.cast(
-                    EvaluationProvider, configuration.providers[evaluation.source]
-                )
-                evaluation_hash = evaluation.hash
-                evaluation_value = lock.load(evaluation_name, evaluation_hash)
-                if evaluation_value is None or update:
-                    evaluation_value = evaluation.evaluate(evaluation_source)
-                    update = True
-                evaluations_resolved.update({evaluation_name: evaluation_value})
-            if update:
-                lock.dump(
-                    evaluations_resolved,
-                    {k: v.hash for k, v in (self.evaluations or {}).items()},
-                )
-        except KeyError as exc:
-            raise gdbt.errors.ProviderNotFound(str(exc)) from None
-        lookups_resolved = {name: value for name, value in (self.lookups or {}).items()}
+        engine = EvaluationEngine(
+            configuration.providers,
+            base,
+            configuration.concurrency.budget("evaluation"),
+            update,
+            limits=configuration.concurrency.budgets("evaluation"),
+        )
+        evaluations_resolved = engine.resolve({name: self.evaluations or {}})[name]
+        lookups_resolved = self.resolve_lookups(base)
         return evaluations_resolved, lookups_resolved
 
+    def resolve_lookups(
+        self, base: typing.Optional[str] = None
+    ) -> typing.Dict[str, typing.Any]:
+        lookups_resolved = {
+            name: resolve_lookup(value, base)
+            for name, value in (self.lookups or {}).items()
+        }
+        return lookups_resolved
+
     def resolve_loops(
         self,
         evaluations: typing.Dict[str, Evaluation],
@@ -82,25 +132,101 @@ class Template(abc.ABC):
         for item in iterator:
             yield item
 
-    def resolve(
+    def model_template(
+        self, base: typing.Optional[str] = None
+    ) -> typing.Union["Model", "StructuredModel"]:
+        model_format = self.format or MODEL_FORMAT_JSON
+        if model_format == MODEL_FORMAT_JSON:
+            return Model(self.model, base, self.evaluations_grouped)
+        if model_format == MODEL_FORMAT_STRUCTURED:
+            return StructuredModel(self.model, base, self.evaluations_grouped)
+        raise gdbt.errors.ConfigFormatInvalid(f"Invalid model format: {model_format}")
+
+    def render(
         self,
         name: str,
+        evaluations: typing.Dict[str, typing.Any],
+        lookups: typing.Dict[str, typing.Any],
         configuration: Configuration,
-        base: str,
-        update: bool,
+        items: typing.Iterable[typing.Optional[typing.Any]],
+        cache: typing.Optional[RenderCache] = None,
+        base: typing.Optional[str] = None,
+    ) -> typing.List[typing.Tuple[str, typing.Dict[str, typing.Any]]]:
+        models = []
+        model_template = self.model_template(base)
+        digest = ""
+        if cache:
+            digest = cache.digest(
+                self.model,
+                evaluations,
+                lookups,
+                configuration.providers,
+                self.render_options,
+            )
+        models_cached = {}
+        keys = {}
+        for item in items:
+            resource_name = self.resource_name(name, item)
+            key = cache.key(digest, item) if cache else ""
+            model_cached = cache.get(key) if cache else None
+            keys.update({resource_name: key})
+            models_cached.update({resource_name: (item, model_cached)})
+        items_pending = [
+            item
+            for item, model_cached in models_cached.values()
+            if model_cached is None
+        ]
+        models_rendered = model_template.render_items(
+            evaluations, lookups, configuration, items_pending
+        )
+        for resource_name, (item, model_dict) in models_cached.items():
+            if model_dict is None:
+                model = next(models_rendered)
+                if isinstance(model, str):
+                    model_dict = self.parse_model(model)
+                else:
+                    model_dict = model
+                if not isinstance(model_dict, dict):
+                    raise gdbt.errors.ConfigFormatInvalid(
+                        f"Model of {resource_name} is not a mapping"
+                    )
+                if cache:
+                    cache.put(keys[resource_name], model_dict)
+            models.append((resource_name, model_dict))
+        return models
+
+    def build(
+        self, models: typing.Iterable[typing.Tuple[str, typing.Dict[str, typing.Any]]]
     ) -> typing.Dict[str, Resource]:
-        evaluations, lookups = self.resolve_vars(configuration, base, name, update)
         resources = {}
-        for item in self.resolve_loops(evaluations, lookups):
-            resource_name = name
-            if item:
-                resource_name += f":{item}"
+        for resource_name, model in models:
             uid = self.format_uid(resource_name)
-            model = Model(self.model).render(evaluations, lookups, configuration, item)
             resource = self.make_resource(self.provider, uid, model)
             resources.update({resource_name: resource})
         return resources
 
+    def resolve(
+        self,
+        name: str,
+        configuration: Configuration,
+        base: str,
+        update: bool,
+        cache: typing.Optional[RenderCache] = None,
+    ) -> typing.Dict[str, Resource]:
+        evaluations, lookups = self.resolve_vars(configuration, base, name, update)
+        items = self.resolve_loops(evaluations, lookups)
+        models = self.render(
+            name, evaluations, lookups, configuration, items, cache, base
+        )
+        resources = self.build(models)
+        return resources
+
+    def resource_name(self, name: str, item: typing.Optional[typing.Any]) -> str:
+        resource_name = name
+        if item:
+            resource_name += f":{item}"
+        return resource_name
+
     def format_uid(self, name: str) -> str:
         uid_hash = hashlib.md5()
         uid_hash.update(name.encode())
@@ -115,12 +241,7 @@ class Dashboard(Template):
 
     kind = "dashboard"
 
-    def make_resource(
-        self,
-        grafana: str,
-        uid: str,
-        model: str,
-    ) -> gdbt.resource.resource.Dashboard:
+    def parse_model(self, model: str) -> typing.Dict[str, typing.Any]:
         try:
             model_dict = json.loads(model)
         except json.JSONDecodeError as e:
@@ -132,6 +253,15 @@ class Dashboard(Template):
                 "printed above this error message." % e
             )
             raise
+        return model_dict
+
+    def make_resource(
+        self,
+        grafana: str,
+        uid: str,
+        model: typing.Dict[str, typing.Any],
+    ) -> gdbt.resource.resource.Dashboard:
+        model_dict = dict(model)
         model_dict.pop("id", None)
         folder_uid = self.format_uid(self.folder)
         resource = gdbt.resource.resource.Dashboard(
@@ -152,20 +282,188 @@ class Folder(Template):
         self,
         grafana: str,
         uid: str,
-        model: str,
+        model: typing.Dict[str, typing.Any],
     ) -> gdbt.resource.resource.Folder:
-        model_dict = json.loads(model)
         resource = gdbt.resource.resource.Folder(
             grafana=grafana,
             uid=uid,
-            model=model_dict,
+            model=model,
         )
         return resource
 
 
+@functools.lru_cache(maxsize=None)
+def environment(base: typing.Optional[str] = None) -> jinja2.Environment:
+    loader: jinja2.BaseLoader = jinja2.BaseLoader()
+    bytecode_cache = None
+    if base:
+        loader = jinja2.FileSystemLoader(str(pathlib.Path(base) / LIBRARY_DIRECTORY))
+        # Bytecode is executed when loaded, so it is never read from the repository
+        bytecode_path = user_cache_path() / TEMPLATE_BYTECODE_DIRECTORY
+        bytecode_path.mkdir(mode=0o700, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_path))
+    env = jinja2.Environment(
+        loader=loader,
+        bytecode_cache=bytecode_cache,
+        variable_start_string=TEMPLATE_VARIABLE_DELIMITER_LEFT,
+        variable_end_string=TEMPLATE_VARIABLE_DELIMITER_RIGHT,
+    )
+    return env
+
+
+def _compile(env: jinja2.Environment, source: str, digest: str) -> jinja2.Template:
+    bytecode_cache = env.bytecode_cache
+    if bytecode_cache is None:
+        return env.from_string(source)
+    bucket = bytecode_cache.get_bucket(env, digest, None, source)
+    if bucket.code is None:
+        bucket.code = env.compile(source)
+        bytecode_cache.set_bucket(bucket)
+    template = env.template_class.from_code(env, bucket.code, env.make_globals(None))
+    return template
+
+
+@attr.s
+class TemplateCache:
+    size: int = attr.ib(default=TEMPLATE_CACHE_SIZE)
+    _templates: typing.Dict[str, typing.Any] = attr.ib(
+        init=False, factory=collections.OrderedDict
+    )
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    @staticmethod
+    def digest(source: str) -> str:
+        source_hash = hashlib.sha256()
+        source_hash.update(source.encode())
+        digest = source_hash.hexdigest()
+        return digest
+
+    def _get(self, key: str, compile: typing.Callable[[], typing.Any]) -> typing.Any:
+        templates = typing.cast(collections.OrderedDict, self._templates)
+        with self._lock:
+            if key in templates:
+                templates.move_to_end(key)
+                return templates[key]
+        template = compile()
+        with self._lock:
+            templates[key] = template
+            while len(templates) > self.size:
+                templates.popitem(last=False)
+        return template
+
+    def get(
+        self, source: str, base: typing.Optional[str] = None, persistent: bool = False
+    ) -> jinja2.Template:
+        env = environment(base)
+        digest = self.digest(source)
+        if persistent:
+            compile = functools.partial(_compile, env, source, digest)
+        else:
+            compile = functools.partial(env.from_string, source)
+        template = self._get(f"{base}:{digest}", compile)
+        return template
+
+    def get_expression(
+        self, source: str, base: typing.Optional[str] = None
+    ) -> typing.Callable[..., typing.Any]:
+        env = environment(base)
+        expression = self._get(
+            f"{base}:expression:{self.digest(source)}",
+            functools.partial(env.compile_expression, source),
+        )
+        return expression
+
+
+template_cache = TemplateCache()
+
+
+LOOP_ITEM_BLOCKS = (
+    jinja2.nodes.FilterBlock,
+    jinja2.nodes.AssignBlock,
+    jinja2.nodes.Macro,
+    jinja2.nodes.CallBlock,
+)
+
+
+def _loop_dependency(
+    node: jinja2.nodes.Node, scoped: bool = False, grouped: bool = False
+) -> str:
+    imports = (jinja2.nodes.Include, jinja2.nodes.Import, jinja2.nodes.FromImport)
+    if isinstance(node, imports) and node.with_context:
+        return LOOP_DEPENDENT
+    # Parent templates always render with the child's context
+    if isinstance(node, jinja2.nodes.Extends):
+        return LOOP_DEPENDENT
+    if isinstance(node, jinja2.nodes.Name) and node.name == "loop" and not scoped:
+        return LOOP_DEPENDENT
+    if isinstance(node, jinja2.nodes.Name) and node.name == "evaluations" and grouped:
+        return LOOP_DEPENDENT
+    if isinstance(node, jinja2.nodes.For):
+        children = (node.target, node.iter, node.test, *node.else_)
+        dependencies = [
+            _loop_dependency(child, scoped, grouped)
+            for child in children
+            if child is not None
+        ]
+        dependencies += [_loop_dependency(child, True, grouped) for child in node.body]
+    elif isinstance(node, jinja2.nodes.Output) and not scoped:
+        dependencies = [
+            LOOP_ITEM_OUTPUT
+            if isinstance(child, jinja2.nodes.Getattr)
+            and isinstance(child.node, jinja2.nodes.Name)
+            and child.node.name == "loop"
+            and child.attr == "item"
+            else _loop_dependency(child, scoped, grouped)
+            for child in node.nodes
+        ]
+    else:
+        dependencies = [
+            _loop_dependency(child, scoped, grouped)
+            for child in node.iter_child_nodes()
+        ]
+    if LOOP_DEPENDENT in dependencies:
+        return LOOP_DEPENDENT
+    if LOOP_ITEM_OUTPUT in dependencies:
+        # Block output can be transformed or reused, so the item value is needed
+        if isinstance(node, LOOP_ITEM_BLOCKS):
+            return LOOP_DEPENDENT
+        return LOOP_ITEM_OUTPUT
+    return LOOP_INVARIANT
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def loop_dependency(source: str, grouped: bool = False) -> str:
+    if not any(marker in source for marker in TEMPLATE_MARKERS):
+        return LOOP_INVARIANT
+    dependency = _loop_dependency(environment().parse(source), grouped=grouped)
+    return dependency
+
+
+def split_evaluations(
+    evaluations: typing.Dict[str, typing.Any],
+    grouped: typing.AbstractSet[str],
+    loop_item: typing.Optional[typing.Any] = None,
+) -> typing.Dict[str, typing.Any]:
+    if not grouped or loop_item is None:
+        return evaluations
+    evaluations_item = dict(evaluations)
+    for name in grouped:
+        evaluations_item.update(
+            {name: (evaluations.get(name) or {}).get(str(loop_item), [])}
+        )
+    return evaluations_item
+
+
 @attr.s
 class Model:
     template: str = attr.ib()
+    base: typing.Optional[str] = attr.ib(default=None)
+    grouped: typing.FrozenSet[str] = attr.ib(factory=frozenset)
+
+    @property
+    def compiled(self) -> jinja2.Template:
+        template = template_cache.get(self.template, self.base, persistent=True)
+        return template
 
     def render(
         self,
@@ -174,20 +472,177 @@ class Model:
         configuration: Configuration,
         loop_item: typing.Optional[typing.Any] = None,
     ) -> str:
-        env = jinja2.Environment(
-            loader=jinja2.BaseLoader(),
-            variable_start_string=TEMPLATE_VARIABLE_DELIMITER_LEFT,
-            variable_end_string=TEMPLATE_VARIABLE_DELIMITER_RIGHT,
-        )
-        template = env.from_string(self.template)
-        rendered = template.render(
+        rendered = self.compiled.render(
             providers=configuration.providers,
-            evaluations=evaluations,
+            evaluations=split_evaluations(evaluations, self.grouped, loop_item),
             lookups=lookups,
             loop=dict(item=loop_item),
         )
         return rendered
 
+    def skeleton(
+        self,
+        evaluations: typing.Dict[str, Evaluation],
+        lookups: typing.Dict[str, Lookup],
+        configuration: Configuration,
+    ) -> typing.Optional[typing.List[str]]:
+        if loop_dependency(self.template, bool(self.grouped)) == LOOP_DEPENDENT:
+            return None
+        placeholder = f"\0{uuid.uuid4().hex}\0"
+        rendered = self.render(evaluations, lookups, configuration, placeholder)
+        return rendered.split(placeholder)
+
+    def render_items(
+        self,
+        evaluations: typing.Dict[str, Evaluation],
+        lookups: typing.Dict[str, Lookup],
+        configuration: Configuration,
+        loop_items: typing.Sequence[typing.Optional[typing.Any]],
+    ) -> typing.Generator[str, None, None]:
+        skeleton = None
+        if len(loop_items) > 1:
+            skeleton = self.skeleton(evaluations, lookups, configuration)
+        for loop_item in loop_items:
+            if skeleton is None:
+                yield self.render(evaluations, lookups, configuration, loop_item)
+                continue
+            yield str(loop_item).join(skeleton)
+
+
+@attr.s(frozen=True)
+class _Slot:
+    source: str = attr.ib()
+
+
+@attr.s(frozen=True)
+class _Branch:
+    items: typing.List[typing.Tuple[typing.Any, typing.Any]] = attr.ib()
+    mapping: bool = attr.ib()
+
+
+@attr.s
+class StructuredModel:
+    template: typing.Any = attr.ib()
+    base: typing.Optional[str] = attr.ib(default=None)
+    grouped: typing.FrozenSet[str] = attr.ib(factory=frozenset)
+
+    def _render_leaf(
+        self, leaf: str, context: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        if not any(marker in leaf for marker in TEMPLATE_MARKERS):
+            return leaf
+        expression = TEMPLATE_EXPRESSION.fullmatch(leaf.strip())
+        if expression:
+            value = template_cache.get_expression(expression.group(1), self.base)(
+                **context
+            )
+            return copy.deepcopy(value)
+        return template_cache.get(leaf, self.base).render(**context)
+
+    def _render_key(
+        self, key: typing.Any, context: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        if not isinstance(key, str):
+            return key
+        if not any(marker in key for marker in TEMPLATE_MARKERS):
+            return key
+        return template_cache.get(key, self.base).render(**context)
+
+    def _partial(
+        self, node: typing.Any, context: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        grouped = bool(self.grouped)
+        if isinstance(node, str):
+            if loop_dependency(node, grouped) != LOOP_INVARIANT:
+                return _Slot(node)
+            return self._render_leaf(node, context)
+        if isinstance(node, (dict, list)):
+            mapping = isinstance(node, dict)
+            entries: typing.Iterable[typing.Tuple[typing.Any, typing.Any]]
+            if isinstance(node, dict):
+                entries = node.items()
+            else:
+                entries = enumerate(node)
+            items = []
+            for key, value in entries:
+                if mapping and isinstance(key, str):
+                    if loop_dependency(key, grouped) != LOOP_INVARIANT:
+                        key = _Slot(key)
+                    else:
+                        key = self._render_key(key, context)
+                items.append((key, self._partial(value, context)))
+            if any(
+                isinstance(part, (_Slot, _Branch)) for item in items for part in item
+            ):
+                return _Branch(items, mapping)
+            if mapping:
+                return dict(items)
+            return [value for _, value in items]
+        return node
+
+    def _fill(
+        self, node: typing.Any, context: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        if isinstance(node, _Slot):
+            return self._render_leaf(node.source, context)
+        if isinstance(node, _Branch):
+            if not node.mapping:
+                return [self._fill(value, context) for _, value in node.items]
+            return {
+                self._render_key(key.source, context)
+                if isinstance(key, _Slot)
+                else key: self._fill(value, context)
+                for key, value in node.items
+            }
+        if isinstance(node, (dict, list)):
+            # Invariant subtrees are shared by all items, each model gets its own
+            return copy.deepcopy(node)
+        return node
+
+    @staticmethod
+    def _context(
+        evaluations: typing.Dict[str, Evaluation],
+        lookups: typing.Dict[str, Lookup],
+        configuration: Configuration,
+        loop_item: typing.Optional[typing.Any] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        context = {
+            "providers": configuration.providers,
+            "evaluations": evaluations,
+            "lookups": lookups,
+            "loop": dict(item=loop_item),
+        }
+        return context
+
+    def render(
+        self,
+        evaluations: typing.Dict[str, Evaluation],
+        lookups: typing.Dict[str, Lookup],
+        configuration: Configuration,
+        loop_item: typing.Optional[typing.Any] = None,
+    ) -> typing.Any:
+        rendered = next(
+            self.render_items(evaluations, lookups, configuration, [loop_item])
+        )
+        return rendered
+
+    def render_items(
+        self,
+        evaluations: typing.Dict[str, Evaluation],
+        lookups: typing.Dict[str, Lookup],
+        configuration: Configuration,
+        loop_items: typing.Sequence[typing.Optional[typing.Any]],
+    ) -> typing.Generator[typing.Any, None, None]:
+        context = self._context(evaluations, lookups, configuration)
+        skeleton = self._partial(self.template, context)
+        for loop_item in loop_items:
+            context_item = dict(
+                context,
+                evaluations=split_evaluations(evaluations, self.grouped, loop_item),
+                loop=dict(item=loop_item),
+            )
+            yield self._fill(skeleton, context_item)
+
 
 @attr.s
 class Iterator:
@@ -203,8 +658,21 @@ class Iterator:
             "lookups": lookups,
         }
         try:
-            iterable = dpath.util.get(namespace, self.path, separator=".")
-        except KeyError:
+            if any(char in self.path for char in ITERATOR_GLOB_CHARACTERS):
+                iterable = dpath.util.get(namespace, self.path, separator=".")
+            else:
+                # Walk the path segments only, lookup tables are not scanned
+                segments = [
+                    int(segment) if segment.isdigit() else segment
+                    for segment in self.path.split(".")
+                ]
+                iterable = dpath.segments.get(namespace, segments)
+        except (
+            KeyError,
+            IndexError,
+            TypeError,
+            dpath.exceptions.PathNotFound,
+        ):
             raise gdbt.errors.VariableNotFound(self.path)
         try:
             for item in iterable:
@@ -213,9 +681,19 @@ class Iterator:
             raise gdbt.errors.VariableNotIterable(self.path)
 
 
+def _load_file(file: pathlib.Path) -> typing.Dict[str, typing.Any]:
+    with open(file, "r") as f_template:
+        data = yaml.load(f_template, Loader=YAML_LOADER)
+    file_data = config.Configuration(data).as_attrdict()
+    if isinstance(data, dict) and "model" in data:
+        file_data["model"] = data["model"]
+    return file_data
+
+
 @attr.s
 class TemplateLoader:
     path: pathlib.Path = attr.ib(factory=pathlib.Path)
+    processes: typing.Optional[int] = attr.ib(default=None)
 
     @property
     def base_path(self) -> pathlib.Path:
@@ -244,39 +722,70 @@ class TemplateLoader:
 
     @staticmethod
     def load_files(
-        files: typing.Dict[str, pathlib.Path]
+        files: typing.Dict[str, pathlib.Path], processes: typing.Optional[int] = None
     ) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
-        files_data: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
-        for file_tag, file in files.items():
-            file_data = config.config_from_yaml(
-                str(file), read_from_file=True
-            ).as_attrdict()
-            files_data.update({file_tag: file_data})
+        processes = min(processes or os.cpu_count() or 1, len(files))
+        if processes <= 1 or len(files) <= TEMPLATE_LOAD_CHUNK_SIZE:
+            files_data = {
+                file_tag: _load_file(file) for file_tag, file in files.items()
+            }
+            return files_data
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(
+            processes, mp_context=context
+        ) as pool:
+            files_data = dict(
+                zip(
+                    files.keys(),
+                    pool.map(
+                        _load_file,
+                        files.values(),
+                        chunksize=TEMPLATE_LOAD_CHUNK_SIZE,
+                    ),
+                )
+            )
         return files_data
 
     def deserialize(self) -> typing.Dict[str, Template]:
         try:
             templates: typing.Dict[str, Template] = {}
-            template_files = self.tag_files(self.list_files(self.path), self.base_path)
-            templates_data = self.load_files(template_files)
+            base_path = self.base_path
+            template_files = self.tag_files(self.list_files(self.path), base_path)
+            cache = DefinitionCache(str(base_path))
+            cache.load()
+            template_files_pending = {}
+            templates_data = {}
+            for template_tag, template_file in template_files.items():
+                template_data = cache.get(template_file)
+                if template_data is None:
+                    template_files_pending.update({template_tag: template_file})
+                    continue
+                templates_data.update({template_tag: template_data})
+            templates_loaded = self.load_files(template_files_pending, self.processes)
+            for template_tag, template_data in templates_loaded.items():
+                cache.put(template_files[template_tag], template_data)
+            templates_data.update(templates_loaded)
             for template_tag, template_data in templates_data.items():
                 template = deserialize.deserialize(Template, template_data)
                 templates.update({template_tag: template})
+            cache.dump()
         except (
             TypeError,
             yaml.YAMLError,
             deserialize.DeserializeException,
         ) as exc:
             raise gdbt.errors.ConfigFormatInvalid(str(exc))
+        templates = {tag: templates[tag] for tag in template_files}
         return templates
 
 
 def load(
-    path: typing.Optional[typing.Union[pathlib.Path, str]] = None
+    path: typing.Optional[typing.Union[pathlib.Path, str]] = None,
+    processes: typing.Optional[int] = None,
 ) -> typing.Dict[str, Template]:
     if not path:
         path = pathlib.Path(".")
     if not isinstance(path, pathlib.Path):
         path = pathlib.Path(typing.cast(str, path))
-    templates = TemplateLoader(path).deserialize()
+    templates = TemplateLoader(path, processes).deserialize()
     return templates
@@ -1,5 +1,24 @@
+from .cache import (
+    EvaluationCache,
+    EvaluationCacheBackend,
+    LocalEvaluationCacheBackend,
+    StateEvaluationCacheBackend,
+)
+from .engine import EvaluationEngine
 from .evaluation import Evaluation, EvaluationLock
-from .lookup import Lookup
+from .lookup import Lookup, LookupTable, resolve_lookup
 
-# Export Evaluation and EvaluationLock classes, Lookup type alias
-__all__ = ["Evaluation", "EvaluationLock", "Lookup"]
+# Export Evaluation, EvaluationEngine, EvaluationLock, LookupTable and evaluation cache classes,
+# Lookup type alias and resolve_lookup function
+__all__ = [
+    "Evaluation",
+    "EvaluationCache",
+    "EvaluationCacheBackend",
+    "EvaluationEngine",
+    "EvaluationLock",
+    "LocalEvaluationCacheBackend",
+    "Lookup",
+    "LookupTable",
+    "StateEvaluationCacheBackend",
+    "resolve_lookup",
+]
@@ -0,0 +1,104 @@
+import abc
+import json
+import pathlib
+import time
+import typing
+
+import attr
+
+import gdbt.errors
+from gdbt.files import write_atomic
+from gdbt.provider import StateProvider
+
+EVALUATION_CACHE_DIRECTORY = ".gdbt/evaluations"
+EVALUATION_CACHE_PREFIX = "gdbt-evaluations"
+EVALUATION_CACHE_EXTENSION = ".cache"
+
+
+class EvaluationCacheBackend(abc.ABC):
+    @abc.abstractmethod
+    def get(self, key: str) -> typing.Optional[str]:
+        pass
+
+    @abc.abstractmethod
+    def put(self, key: str, content: str) -> None:
+        pass
+
+
+@attr.s
+class LocalEvaluationCacheBackend(EvaluationCacheBackend):
+    base: str = attr.ib()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        path = (
+            pathlib.Path(self.base)
+            / EVALUATION_CACHE_DIRECTORY
+            / f"{key}{EVALUATION_CACHE_EXTENSION}"
+        )
+        return path
+
+    def get(self, key: str) -> typing.Optional[str]:
+        try:
+            content = self._entry_path(key).read_text()
+        except FileNotFoundError:
+            return None
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, content)
+        except PermissionError as exc:
+            raise gdbt.errors.FileAccessDenied(str(exc))
+
+
+@attr.s
+class StateEvaluationCacheBackend(EvaluationCacheBackend):
+    provider: StateProvider = attr.ib()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        # Cache entries don't use the state object extension, so they are never listed as state
+        path = (
+            self.provider._base_path
+            / EVALUATION_CACHE_PREFIX
+            / f"{key}{EVALUATION_CACHE_EXTENSION}"
+        )
+        return path
+
+    def get(self, key: str) -> typing.Optional[str]:
+        try:
+            content = self.provider._get(self._entry_path(key))
+        except (FileNotFoundError, gdbt.errors.S3ObjectNotFound):
+            return None
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        self.provider._put(self._entry_path(key), content)
+
+
+@attr.s
+class EvaluationCache:
+    backend: EvaluationCacheBackend = attr.ib()
+
+    def get(
+        self, hash: str, ttl: typing.Optional[int] = None
+    ) -> typing.Optional[typing.Tuple[typing.Any, float]]:
+        content = self.backend.get(hash)
+        if content is None:
+            return None
+        try:
+            entry = json.loads(content)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(entry, dict) or entry.get("hash") != hash:
+            return None
+        if ttl and time.time() - entry.get("time", 0) > ttl:
+            return None
+        return entry.get("data"), entry.get("time", 0)
+
+    def put(self, hash: str, data: typing.Any, evaluated: float) -> None:
+        content = json.dumps(
+            {"data": data, "hash": hash, "time": evaluated}, sort_keys=True
+        )
+        self.backend.put(hash, content)
@@ -0,0 +1,166 @@
+import collections
+import concurrent.futures
+import hashlib
+import time
+import typing
+
+import attr
+
+import gdbt.errors
+from gdbt.dynamic.cache import EvaluationCache
+from gdbt.dynamic.evaluation import Evaluation, EvaluationLock
+from gdbt.provider import EvaluationProvider, Provider
+
+EVALUATION_CONCURRENCY = 8
+
+
+@attr.s
+class EvaluationEngine:
+    providers: typing.Mapping[str, Provider] = attr.ib()
+    base: str = attr.ib()
+    threads: typing.Optional[int] = attr.ib(default=None)
+    update: bool = attr.ib(default=False)
+    cache: typing.Optional[EvaluationCache] = attr.ib(default=None)
+    ttl: typing.Optional[int] = attr.ib(default=None)
+    # Per-provider budgets, overriding each provider's own concurrency setting
+    limits: typing.Optional[typing.Mapping[str, int]] = attr.ib(default=None)
+
+    def _provider(self, source: str) -> EvaluationProvider:
+        try:
+            provider = self.providers[source]
+        except KeyError as exc:
+            raise gdbt.errors.ProviderNotFound(str(exc)) from None
+        return typing.cast(EvaluationProvider, provider)
+
+    def evaluate(
+        self, evaluations: typing.Mapping[str, Evaluation]
+    ) -> typing.Dict[str, typing.Any]:
+        if not evaluations:
+            return {}
+        limits: typing.Dict[str, int] = {}
+        queues: typing.Dict[str, typing.Deque[str]] = {}
+        for evaluation_hash, evaluation in evaluations.items():
+            provider = self._provider(evaluation.source)
+            concurrency = (self.limits or {}).get(evaluation.source) or getattr(
+                provider, "concurrency", None
+            )
+            limits.setdefault(evaluation.source, concurrency or EVALUATION_CONCURRENCY)
+            queues.setdefault(evaluation.source, collections.deque())
+            queues[evaluation.source].append(evaluation_hash)
+
+        def run(evaluation: Evaluation) -> typing.Any:
+            return evaluation.evaluate(self._provider(evaluation.source))
+
+        # Evaluations are only handed to the pool once their provider has spare
+        # budget, taking providers in turns, so a slow provider cannot hold all threads
+        threads = min(self.threads or len(evaluations), len(evaluations))
+        running: typing.Dict[concurrent.futures.Future, typing.Tuple[str, str]] = {}
+        active: typing.Counter[str] = collections.Counter()
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(threads) as pool:
+            while queues or running:
+                submitted = True
+                while submitted and len(running) < threads:
+                    submitted = False
+                    for source in list(queues):
+                        if len(running) >= threads:
+                            break
+                        if active[source] >= limits[source]:
+                            continue
+                        evaluation_hash = queues[source].popleft()
+                        if not queues[source]:
+                            del queues[source]
+                        future = pool.submit(run, evaluations[evaluation_hash])
+                        running.update({future: (source, evaluation_hash)})
+                        active[source] += 1
+                        submitted = True
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    source, evaluation_hash = running.pop(future)
+                    active[source] -= 1
+                    results.update({evaluation_hash: future.result()})
+        return {
+            evaluation_hash: results[evaluation_hash] for evaluation_hash in evaluations
+        }
+
+    def ttl_for(self, evaluation: Evaluation) -> typing.Optional[int]:
+        ttl = evaluation.ttl if evaluation.ttl is not None else self.ttl
+        return ttl
+
+    def cache_key(self, evaluation: Evaluation) -> str:
+        # Sources of the same name may point to different servers across
+        # configurations sharing the cache
+        provider = self._provider(evaluation.source)
+        data = "\0".join([evaluation.hash, str(getattr(provider, "endpoint", ""))])
+        md5 = hashlib.md5()
+        md5.update(data.encode())
+        key = md5.hexdigest()
+        return key
+
+    def fetch(
+        self, evaluations: typing.Mapping[str, Evaluation]
+    ) -> typing.Dict[str, typing.Tuple[typing.Any, float]]:
+        results: typing.Dict[str, typing.Tuple[typing.Any, float]] = {}
+        pending: typing.Dict[str, Evaluation] = {}
+        for evaluation_hash, evaluation in evaluations.items():
+            cached = None
+            if self.cache and not self.update:
+                cached = self.cache.get(
+                    self.cache_key(evaluation), self.ttl_for(evaluation)
+                )
+            if cached is None:
+                pending.update({evaluation_hash: evaluation})
+                continue
+            results.update({evaluation_hash: cached})
+        evaluated = time.time()
+        for evaluation_hash, value in self.evaluate(pending).items():
+            results.update({evaluation_hash: (value, evaluated)})
+            if self.cache:
+                self.cache.put(
+                    self.cache_key(evaluations[evaluation_hash]), value, evaluated
+                )
+        return results
+
+    def resolve(
+        self, evaluations: typing.Mapping[str, typing.Mapping[str, Evaluation]]
+    ) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        resolved: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        pending: typing.Dict[str, Evaluation] = {}
+        locks_stale: typing.Dict[str, EvaluationLock] = {}
+        for name, template_evaluations in evaluations.items():
+            lock = EvaluationLock(self.base, name)
+            resolved.update({name: {}})
+            for evaluation_name, evaluation in template_evaluations.items():
+                evaluation_hash = evaluation.hash
+                evaluation_value = None
+                if not self.update:
+                    evaluation_value = lock.load(
+                        evaluation_name, evaluation_hash, self.ttl_for(evaluation)
+                    )
+                if evaluation_value is None:
+                    pending.setdefault(evaluation_hash, evaluation)
+                    locks_stale.update({name: lock})
+                    continue
+                resolved[name].update({evaluation_name: evaluation_value})
+        results = self.fetch(pending)
+        for name, lock in locks_stale.items():
+            template_evaluations = evaluations[name]
+            times = {}
+            for evaluation_name, evaluation in template_evaluations.items():
+                if evaluation_name in resolved[name]:
+                    continue
+                evaluation_value, evaluated = results[evaluation.hash]
+                resolved[name].update({evaluation_name: evaluation_value})
+                times.update({evaluation_name: evaluated})
+            lock.dump(
+                resolved[name],
+                {k: v.hash for k, v in template_evaluations.items()},
+                times,
+            )
+        for name, template_evaluations in evaluations.items():
+            resolved.update(
+                {name: {k: resolved[name][k] for k in template_evaluations}}
+            )
+        return resolved
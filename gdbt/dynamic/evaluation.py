@@ -1,23 +1,33 @@
 import abc
 import json
 import pathlib
+import time
 import typing
 
 import attr
 import deserialize  # type: ignore
 
+import gdbt.errors
+from gdbt.files import write_atomic
 from gdbt.provider import EvaluationProvider
 
+EVALUATION_TIMES_DIRECTORY = ".gdbt/locks"
+
 
 @deserialize.downcast_field("kind")
 @attr.s
 class Evaluation(abc.ABC):
     source: str = attr.ib()
+    ttl: typing.Optional[int] = attr.ib(default=None, kw_only=True)
 
     @abc.abstractmethod
     def evaluate(self, provider: EvaluationProvider) -> typing.Any:
         pass
 
+    @property
+    def grouped(self) -> bool:
+        return False
+
     @property
     @abc.abstractmethod
     def hash(self) -> str:
@@ -28,37 +38,98 @@ class Evaluation(abc.ABC):
 class EvaluationLock:
     base: str = attr.ib()
     name: str = attr.ib()
+    _data: typing.Optional[typing.Dict[str, typing.Any]] = attr.ib(
+        init=False, default=None
+    )
+    _times: typing.Optional[typing.Dict[str, typing.Any]] = attr.ib(
+        init=False, default=None
+    )
 
     @property
     def path(self) -> pathlib.Path:
         path = (pathlib.Path(self.base) / self.name).with_suffix(".lock")
         return path
 
-    def load(
-        self, name: str, hash: str
-    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    @property
+    def times_path(self) -> pathlib.Path:
+        # Evaluation times change on every refresh, so they are kept out of the lock
+        path = (
+            pathlib.Path(self.base) / EVALUATION_TIMES_DIRECTORY / self.name
+        ).with_suffix(".json")
+        return path
+
+    @property
+    def data(self) -> typing.Dict[str, typing.Any]:
+        if self._data is not None:
+            return self._data
         try:
             with open(self.path, "r") as f_lock:
-                data = json.load(f_lock).get(name)
+                self._data = json.load(f_lock)
         except FileNotFoundError:
-            return None
+            self._data = {}
+        return typing.cast(typing.Dict[str, typing.Any], self._data)
+
+    @property
+    def times(self) -> typing.Dict[str, typing.Any]:
+        if self._times is not None:
+            return self._times
+        try:
+            with open(self.times_path, "r") as f_times:
+                self._times = json.load(f_times)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._times = {}
+        return typing.cast(typing.Dict[str, typing.Any], self._times)
+
+    def time(self, name: str, hash: str) -> typing.Optional[float]:
+        entry = self.times.get(name) or {}
+        if entry.get("hash") == hash:
+            return entry.get("time")
+        # Locks written by earlier versions keep the time beside the data
+        return self.data.get(name, {}).get("time")
+
+    def load(
+        self, name: str, hash: str, ttl: typing.Optional[int] = None
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        data = self.data.get(name)
         if not data:
             return None
         if data["hash"] != hash:
             return None
+        if ttl and time.time() - (self.time(name, hash) or 0) > ttl:
+            return None
         return data["data"]
 
     def dump(
         self,
         evaluations: typing.Mapping[str, typing.Any],
         hashes: typing.Mapping[str, str],
+        times: typing.Optional[typing.Mapping[str, float]] = None,
     ) -> None:
         data = {
             name: {"data": evaluations.get(name), "hash": hashes.get(name)}
             for name in evaluations.keys()
-            if evaluations.get(name)
+            if evaluations.get(name) is not None
         }
-        if not data:
+        times_data = {}
+        for name in data:
+            hash = hashes.get(name, "")
+            evaluated = (times or {}).get(name) or self.time(name, hash)
+            if evaluated is not None:
+                times_data.update({name: {"hash": hash, "time": evaluated}})
+        if times_data and times_data != self.times:
+            try:
+                self.times_path.parent.mkdir(parents=True, exist_ok=True)
+                write_atomic(self.times_path, json.dumps(times_data, sort_keys=True))
+            except PermissionError as exc:
+                raise gdbt.errors.FileAccessDenied(str(exc))
+            self._times = times_data
+        if not data or data == self.data:
             return
-        with open(self.path, "w") as f_lock:
-            json.dump(data, f_lock, sort_keys=True, indent=2, ensure_ascii=True)
+        try:
+            write_atomic(
+                self.path,
+                json.dumps(data, sort_keys=True, indent=2, ensure_ascii=True),
+            )
+        except PermissionError as exc:
+            raise gdbt.errors.FileAccessDenied(str(exc))
+        self._data = data
@@ -1,3 +1,198 @@
+import collections.abc
+import csv
+import json
+import mmap
+import pathlib
+import re
+import threading
 import typing
 
+import attr
+
+import gdbt.errors
+
 Lookup = typing.Any
+
+LOOKUP_FILE_KEY = "$file"
+LOOKUP_FORMATS = {
+    ".json": "json",
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+# Leading top-level scalar fields of an NDJSON row, used to find the key without decoding the row
+NDJSON_SCALAR = rb'(?:"(?:[^"\\]|\\.)*"|[^\s,{}\[\]"]+)'
+NDJSON_PREFIX = (
+    rb"\s*\{\s*(?:" + NDJSON_SCALAR + rb"\s*:\s*" + NDJSON_SCALAR + rb"\s*,\s*)*?"
+)
+
+
+@attr.s(eq=False, repr=False)
+class LookupTable(collections.abc.Mapping):
+    path: str = attr.ib()
+    key: typing.Optional[str] = attr.ib(default=None)
+    format: typing.Optional[str] = attr.ib(default=None)
+    _rows: typing.Optional[typing.Dict[str, typing.Any]] = attr.ib(
+        init=False, default=None
+    )
+    _index: typing.Optional[typing.Dict[str, typing.Tuple[int, int]]] = attr.ib(
+        init=False, default=None
+    )
+    _mmap: typing.Optional[mmap.mmap] = attr.ib(init=False, default=None)
+    _decoded: typing.Dict[str, typing.Any] = attr.ib(init=False, factory=dict)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    @property
+    def table_format(self) -> str:
+        table_format = self.format or LOOKUP_FORMATS.get(
+            pathlib.Path(self.path).suffix.lower(), ""
+        )
+        if table_format not in LOOKUP_FORMATS.values():
+            raise gdbt.errors.ConfigFormatInvalid(
+                f"Unknown lookup table format: {self.path}"
+            )
+        return table_format
+
+    @property
+    def signature(self) -> typing.Tuple[int, int]:
+        stat = pathlib.Path(self.path).stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _row_key(self, row: typing.Any, key: typing.Optional[str] = None) -> str:
+        key = key or self.key
+        try:
+            return str(row[key])
+        except (KeyError, IndexError, TypeError):
+            raise gdbt.errors.ConfigFormatInvalid(
+                f"Missing key {key} in lookup table {self.path}"
+            ) from None
+
+    def _load_json(self) -> None:
+        with open(self.path, "r") as f_table:
+            data = json.load(f_table)
+        if isinstance(data, dict) and not self.key:
+            self._rows = data
+            return
+        if not self.key:
+            raise gdbt.errors.ConfigFormatInvalid(
+                f"Lookup table {self.path} is not a mapping, key is required"
+            )
+        self._rows = {self._row_key(row): row for row in data}
+
+    def _load_csv(self) -> None:
+        with open(self.path, "r", newline="") as f_table:
+            reader = csv.DictReader(f_table)
+            fieldnames = reader.fieldnames or []
+            key = self.key or (fieldnames[0] if fieldnames else None)
+            self._rows = {self._row_key(row, key): row for row in reader}
+
+    def _load_ndjson(self) -> None:
+        if not self.key:
+            raise gdbt.errors.ConfigFormatInvalid(
+                f"Lookup table {self.path} is NDJSON, key is required"
+            )
+        key_pattern = re.compile(
+            NDJSON_PREFIX
+            + re.escape(json.dumps(self.key).encode())
+            + rb"\s*:\s*("
+            + NDJSON_SCALAR
+            + rb")"
+        )
+        index: typing.Dict[str, typing.Tuple[int, int]] = {}
+        with open(self.path, "rb") as f_table:
+            if not pathlib.Path(self.path).stat().st_size:
+                self._index = index
+                return
+            table = mmap.mmap(f_table.fileno(), 0, access=mmap.ACCESS_READ)
+        start = 0
+        for line in iter(table.readline, b""):
+            end = start + len(line)
+            if line.strip():
+                match = key_pattern.match(line)
+                if match:
+                    row_key = str(json.loads(match.group(1)))
+                else:
+                    row_key = self._row_key(json.loads(line))
+                index.update({row_key: (start, end)})
+            start = end
+        self._mmap = table
+        self._index = index
+
+    def load(self) -> None:
+        with self._lock:
+            if self._rows is not None or self._index is not None:
+                return
+            try:
+                loaders = {
+                    "json": self._load_json,
+                    "csv": self._load_csv,
+                    "ndjson": self._load_ndjson,
+                }
+                loaders[self.table_format]()
+            except FileNotFoundError:
+                raise gdbt.errors.FileNotFound(self.path)
+            except (json.JSONDecodeError, csv.Error) as exc:
+                raise gdbt.errors.ConfigFormatInvalid(f"{self.path}: {exc}")
+
+    def __getitem__(self, key: typing.Any) -> typing.Any:
+        self.load()
+        if self._rows is not None:
+            return self._rows[str(key)]
+        key = str(key)
+        if key in self._decoded:
+            return self._decoded[key]
+        start, end = typing.cast(dict, self._index)[key]
+        value = json.loads(typing.cast(mmap.mmap, self._mmap)[start:end])
+        self._decoded.update({key: value})
+        return value
+
+    def __iter__(self) -> typing.Iterator[str]:
+        self.load()
+        return iter(typing.cast(dict, self._rows or self._index or {}))
+
+    def __len__(self) -> int:
+        self.load()
+        return len(typing.cast(dict, self._rows or self._index or {}))
+
+    def __repr__(self) -> str:
+        mtime, size = self.signature
+        return f"LookupTable({self.path!r}, {self.key!r}, {mtime}, {size})"
+
+    def __reduce__(self) -> typing.Tuple[typing.Any, ...]:
+        return lookup_table, (self.path, self.key, self.format)
+
+    def __deepcopy__(self, memo: typing.Dict[int, typing.Any]) -> "LookupTable":
+        return self
+
+
+_lookup_tables: typing.Dict[typing.Tuple[typing.Any, ...], LookupTable] = {}
+_lookup_tables_lock = threading.Lock()
+
+
+def lookup_table(
+    path: str, key: typing.Optional[str] = None, format: typing.Optional[str] = None
+) -> LookupTable:
+    try:
+        signature = LookupTable(path).signature
+    except FileNotFoundError:
+        raise gdbt.errors.FileNotFound(path)
+    with _lookup_tables_lock:
+        table = _lookup_tables.setdefault(
+            (path, key, format, signature), LookupTable(path, key, format)
+        )
+    return table
+
+
+def resolve_lookup(value: Lookup, base: typing.Optional[str] = None) -> Lookup:
+    if not isinstance(value, collections.abc.Mapping) or LOOKUP_FILE_KEY not in value:
+        return value
+    base_path = pathlib.Path(base or ".").resolve()
+    path = (base_path / str(value[LOOKUP_FILE_KEY])).resolve()
+    try:
+        path.relative_to(base_path)
+    except ValueError:
+        raise gdbt.errors.ConfigFormatInvalid(
+            f"Lookup table outside of configuration root: {value[LOOKUP_FILE_KEY]}"
+        ) from None
+    table = lookup_table(str(path), value.get("key"), value.get("format"))
+    return table
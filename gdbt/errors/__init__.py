@@ -34,11 +34,21 @@ class GrafanaServerError(GrafanaError):
     code = "ERR_GRAFANA_SERVER_ERROR"
 
 
+class GrafanaCircuitOpen(GrafanaServerError):
+    message = "Grafana requests suspended after repeated server errors"
+    code = "ERR_GRAFANA_CIRCUIT_OPEN"
+
+
 class GrafanaResourceNotFound(GrafanaError):
     message = "Grafana resource not found"
     code = "ERR_GRAFANA_RESOURCE_NOT_FOUND"
 
 
+class GrafanaApplyTimeout(GrafanaError):
+    message = "Timed out applying changes to Grafana"
+    code = "ERR_GRAFANA_APPLY_TIMEOUT"
+
+
 class FileError(ProviderError):
     message = "File error"
     code = "ERR_FILE"
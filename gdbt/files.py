@@ -0,0 +1,23 @@
+import os
+import pathlib
+import stat
+import uuid
+
+FILE_MODE = 0o666
+
+
+def write_atomic(path: pathlib.Path, content: str) -> None:
+    """Replace a file with new content, keeping its permissions"""
+    path_temp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    # Created like any other file, so the umask applies to new files
+    descriptor = os.open(path_temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, FILE_MODE)
+    try:
+        with os.fdopen(descriptor, "w") as f_temp:
+            f_temp.write(content)
+        try:
+            os.chmod(path_temp, stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(path_temp, path)
+    finally:
+        path_temp.unlink(missing_ok=True)
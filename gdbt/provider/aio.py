@@ -0,0 +1,512 @@
+import asyncio
+import collections
+import email.utils
+import functools
+import json
+import os
+import ssl
+import statistics
+import threading
+import time
+import typing
+import urllib.parse
+import urllib.request
+import zlib
+
+import attr
+import requests.certs
+
+HTTP_POOL_SIZE = 100
+HTTP_READ_LIMIT = 2**20
+HTTP_READ_CHUNK = 2**16
+HTTP_OVERLOAD_STATUSES = (429, 502, 503, 504)
+HTTP_IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+HTTP_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+HTTP_REDIRECTS_MAX = 10
+LIMIT_INITIAL = 8
+LIMIT_DECREASE = 0.7
+LIMIT_LATENCY_TOLERANCE = 3.0
+LIMIT_LATENCY_SMOOTHING = 0.05
+LIMIT_LATENCY_SAMPLES = 5
+RETRY_AFTER_MAX = 60.0
+
+Connection = typing.Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+T = typing.TypeVar("T")
+
+
+@attr.s
+class EventLoop:
+    _loop: typing.Optional[asyncio.AbstractEventLoop] = attr.ib(
+        init=False, default=None
+    )
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="gdbt-io", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+        return self._loop
+
+    def run(
+        self,
+        coroutine: typing.Awaitable[T],
+        timeout: typing.Optional[float] = None,
+    ) -> T:
+        future = asyncio.run_coroutine_threadsafe(
+            typing.cast(typing.Coroutine, coroutine), self.loop
+        )
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+
+event_loop = EventLoop()
+
+
+def run(coroutine: typing.Awaitable[T], timeout: typing.Optional[float] = None) -> T:
+    """Run a coroutine on the shared I/O event loop and wait for its result"""
+    return event_loop.run(coroutine, timeout)
+
+
+def interleave(
+    jobs: typing.Iterable[typing.Tuple[str, T]]
+) -> typing.List[typing.Tuple[str, T]]:
+    """Order jobs round-robin by key, so no key waits behind another one's backlog"""
+    queues: typing.Dict[str, typing.List[typing.Tuple[str, T]]] = {}
+    for key, job in jobs:
+        queues.setdefault(key, []).append((key, job))
+    ordered = []
+    for position in range(max((len(queue) for queue in queues.values()), default=0)):
+        for queue in queues.values():
+            if position < len(queue):
+                ordered.append(queue[position])
+    return ordered
+
+
+def schedule(
+    jobs: typing.Iterable[
+        typing.Tuple[str, typing.Callable[[], typing.Awaitable[typing.Any]]]
+    ],
+    limit: int,
+    limits: typing.Optional[typing.Mapping[str, int]] = None,
+    dependencies: typing.Optional[typing.Mapping[int, typing.Iterable[int]]] = None,
+) -> typing.List[asyncio.Future]:
+    """Start jobs under a total limit and per-key limits, fairly across keys
+
+    Jobs wait for their own key's budget before taking a share of the total, so a
+    slow key only holds slots up to its own limit. A job with dependencies (job
+    indices) starts as soon as those finish, and fails with their error if one
+    fails. Tasks are returned in job order.
+    """
+    jobs = list(jobs)
+    total = asyncio.Semaphore(limit)
+    semaphores = {
+        key: asyncio.Semaphore(limits[key])
+        for key, _ in jobs
+        if limits and limits.get(key)
+    }
+
+    async def run_job(
+        index: int, key: str, job: typing.Callable[[], typing.Awaitable[typing.Any]]
+    ) -> typing.Any:
+        for dependency in (dependencies or {}).get(index, ()):
+            await asyncio.shield(tasks[dependency])
+        semaphore = semaphores.get(key)
+        if semaphore is None:
+            async with total:
+                return await job()
+        async with semaphore:
+            async with total:
+                return await job()
+
+    tasks: typing.Dict[int, asyncio.Future] = {}
+    indexed = [(key, (index, job)) for index, (key, job) in enumerate(jobs)]
+    for key, (index, job) in interleave(indexed):
+        tasks.update({index: asyncio.ensure_future(run_job(index, key, job))})
+    return [tasks[index] for index in range(len(jobs))]
+
+
+def proxied(url: str) -> bool:
+    endpoint = urllib.parse.urlsplit(url)
+    if not urllib.request.getproxies().get(endpoint.scheme):
+        return False
+    return not urllib.request.proxy_bypass(endpoint.netloc)
+
+
+@functools.lru_cache(maxsize=None)
+def ssl_context(cafile: str) -> ssl.SSLContext:
+    if os.path.isdir(cafile):
+        return ssl.create_default_context(capath=cafile)
+    return ssl.create_default_context(cafile=cafile)
+
+
+def ca_bundle() -> str:
+    """CA bundle chosen the way requests does: from the environment or certifi"""
+    return (
+        os.environ.get("REQUESTS_CA_BUNDLE")
+        or os.environ.get("CURL_CA_BUNDLE")
+        or requests.certs.where()
+    )
+
+
+def retry_after(value: typing.Optional[str]) -> typing.Optional[float]:
+    if not value:
+        return None
+    try:
+        return min(max(float(value), 0.0), RETRY_AFTER_MAX)
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return min(max(date.timestamp() - time.time(), 0.0), RETRY_AFTER_MAX)
+
+
+def decode(data: bytes, encoding: typing.Optional[str]) -> bytes:
+    encoding = (encoding or "identity").strip().lower()
+    if not data or encoding == "identity":
+        return data
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(data)
+            except zlib.error:
+                # Some servers send raw deflate data without the zlib header
+                return zlib.decompress(data, -zlib.MAX_WBITS)
+    except zlib.error as exc:
+        raise OSError(f"Invalid {encoding} response body: {exc}")
+    raise OSError(f"Unsupported response encoding: {encoding}")
+
+
+@attr.s
+class ConcurrencyLimiter:
+    """AIMD limit on in-flight requests, driven by latency, overload responses and Retry-After"""
+
+    maximum: int = attr.ib(default=HTTP_POOL_SIZE)
+    adaptive: bool = attr.ib(default=True)
+    limit: float = attr.ib(init=False, default=0.0)
+    inflight: int = attr.ib(init=False, default=0)
+    latency: typing.Optional[float] = attr.ib(init=False, default=None)
+    latencies: typing.Deque[float] = attr.ib(
+        init=False, factory=lambda: collections.deque(maxlen=LIMIT_LATENCY_SAMPLES)
+    )
+    blocked_until: float = attr.ib(init=False, default=0.0)
+    _decreased: typing.Optional[float] = attr.ib(init=False, default=None)
+    _changed: typing.Optional[asyncio.Event] = attr.ib(init=False, default=None)
+
+    def __attrs_post_init__(self) -> None:
+        self.limit = min(self.maximum, LIMIT_INITIAL) if self.adaptive else self.maximum
+
+    async def _wait(self, timeout: typing.Optional[float] = None) -> None:
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    async def acquire(self) -> float:
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                await self._wait(delay)
+                continue
+            if self.inflight < max(1, int(self.limit)):
+                break
+            await self._wait()
+        self.inflight += 1
+        return time.monotonic()
+
+    def release(
+        self,
+        started: float,
+        overloaded: bool = False,
+        retry_after: typing.Optional[float] = None,
+        completed: bool = True,
+    ) -> None:
+        # Synchronous, so a cancelled request can't leave its slot taken
+        now = time.monotonic()
+        self.inflight -= 1
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        if self.adaptive and (completed or overloaded):
+            self._adjust(now, now - started, overloaded)
+        self._notify()
+
+    @property
+    def congested(self) -> bool:
+        # Latency must grow for most recent requests, a single slow one is no signal
+        if self.latency is None or len(self.latencies) < LIMIT_LATENCY_SAMPLES:
+            return False
+        latency = statistics.median(self.latencies)
+        return latency > self.latency * LIMIT_LATENCY_TOLERANCE
+
+    def _adjust(self, now: float, latency: float, overloaded: bool) -> None:
+        if not overloaded:
+            self.latencies.append(latency)
+        if overloaded or self.congested:
+            # Decrease at most once per round trip, a burst of errors is one signal
+            if self._decreased is None or now - self._decreased > (
+                self.latency or latency
+            ):
+                self.limit = max(1.0, self.limit * LIMIT_DECREASE)
+                self._decreased = now
+        elif self._decreased is None:
+            # Slow start until the first congestion signal
+            self.limit = min(float(self.maximum), self.limit + 1)
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+        if not overloaded:
+            if self.latency is None:
+                self.latency = latency
+            self.latency += (latency - self.latency) * LIMIT_LATENCY_SMOOTHING
+
+
+class HTTPConnectionStale(ConnectionResetError):
+    """Connection closed before any part of the response was read"""
+
+
+@attr.s
+class HTTPResponse:
+    status: int = attr.ib()
+    headers: typing.Dict[str, str] = attr.ib()
+    body: bytes = attr.ib()
+
+    def json(self) -> typing.Any:
+        if not self.body.strip():
+            return None
+        return json.loads(self.body)
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", "replace")
+
+
+@attr.s
+class HTTPClient:
+    """Minimal HTTP/1.1 client with a keep-alive connection pool"""
+
+    url: str = attr.ib()
+    headers: typing.Dict[str, str] = attr.ib(factory=dict)
+    limit: int = attr.ib(default=HTTP_POOL_SIZE)
+    timeout: typing.Optional[float] = attr.ib(default=None)
+    connect_timeout: typing.Optional[float] = attr.ib(default=None)
+    adaptive: bool = attr.ib(default=True)
+    limiter: ConcurrencyLimiter = attr.ib(init=False)
+    _connections: typing.List[Connection] = attr.ib(init=False, factory=list)
+
+    @limiter.default
+    def _limiter(self) -> ConcurrencyLimiter:
+        return ConcurrencyLimiter(self.limit, self.adaptive)
+
+    @property
+    def endpoint(self) -> urllib.parse.SplitResult:
+        return urllib.parse.urlsplit(self.url)
+
+    async def _connect(self) -> Connection:
+        endpoint = self.endpoint
+        context = None
+        if endpoint.scheme == "https":
+            context = ssl_context(ca_bundle())
+        port = endpoint.port or {"http": 80, "https": 443}[endpoint.scheme]
+        connection = await asyncio.wait_for(
+            asyncio.open_connection(
+                endpoint.hostname, port, ssl=context, limit=HTTP_READ_LIMIT
+            ),
+            self.connect_timeout or self.timeout,
+        )
+        return connection
+
+    @staticmethod
+    def _close(connection: Connection) -> None:
+        connection[1].close()
+
+    async def _read(self, read: typing.Awaitable[T]) -> T:
+        # The timeout applies to each read, not to the whole response
+        return await asyncio.wait_for(read, self.timeout)
+
+    async def _read_exactly(self, reader: asyncio.StreamReader, size: int) -> bytes:
+        chunks: typing.List[bytes] = []
+        while size > 0:
+            chunk = await self._read(reader.read(min(size, HTTP_READ_CHUNK)))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"".join(chunks), size)
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    async def _read_until_eof(self, reader: asyncio.StreamReader) -> bytes:
+        chunks: typing.List[bytes] = []
+        while True:
+            chunk = await self._read(reader.read(HTTP_READ_CHUNK))
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        chunks: typing.List[bytes] = []
+        while True:
+            line = await self._read(reader.readline())
+            try:
+                size = int(line.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise OSError(f"Invalid chunk size: {line!r}")
+            if not size:
+                break
+            chunks.append(await self._read_exactly(reader, size))
+            await self._read_exactly(reader, 2)
+        while (await self._read(reader.readline())) not in (b"\r\n", b"\n", b""):
+            pass
+        return b"".join(chunks)
+
+    async def _exchange(
+        self, connection: Connection, method: str, path: str, body: bytes
+    ) -> typing.Tuple[HTTPResponse, bool]:
+        reader, writer = connection
+        headers = {
+            "Host": self.endpoint.netloc,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "Content-Length": str(len(body)),
+            **self.headers,
+        }
+        if body:
+            headers.update({"Content-Type": "application/json"})
+        request = [f"{method} {path} HTTP/1.1"]
+        request.extend(f"{name}: {value}" for name, value in headers.items())
+        try:
+            writer.write(("\r\n".join(request) + "\r\n\r\n").encode("latin-1") + body)
+            await self._read(writer.drain())
+            status_line = await self._read(reader.readline())
+        except ConnectionError as exc:
+            raise HTTPConnectionStale(str(exc)) from exc
+        if not status_line:
+            raise HTTPConnectionStale("Connection closed by server")
+        if not status_line.endswith(b"\n"):
+            raise ConnectionResetError("Connection closed while reading status line")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        response_headers = {}
+        while True:
+            line = await self._read(reader.readline())
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers.update({name.strip().lower(): value.strip()})
+        keep_alive = (
+            version != "HTTP/1.0"
+            and response_headers.get("connection", "").lower() != "close"
+        )
+        if method == "HEAD" or int(status) in (204, 304) or int(status) < 200:
+            data = b""
+        elif "chunked" in response_headers.get("transfer-encoding", "").lower():
+            data = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            data = await self._read_exactly(
+                reader, int(response_headers["content-length"])
+            )
+        else:
+            data = await self._read_until_eof(reader)
+            keep_alive = False
+        data = decode(data, response_headers.get("content-encoding"))
+        return HTTPResponse(int(status), response_headers, data), keep_alive
+
+    async def request(
+        self, method: str, path: str, json_data: typing.Any = None
+    ) -> HTTPResponse:
+        body = b""
+        if json_data is not None:
+            body = json.dumps(json_data).encode()
+        path = self.endpoint.path.rstrip("/") + path
+        started = await self.limiter.acquire()
+        try:
+            response = await self._request(method, path, body)
+        except (OSError, EOFError, asyncio.TimeoutError):
+            self.limiter.release(started, overloaded=True)
+            raise
+        except BaseException:
+            self.limiter.release(started, completed=False)
+            raise
+        self.limiter.release(
+            started,
+            overloaded=response.status in HTTP_OVERLOAD_STATUSES,
+            retry_after=retry_after(response.headers.get("retry-after")),
+        )
+        return response
+
+    def _redirect(self, path: str, location: str) -> typing.Optional[str]:
+        endpoint = self.endpoint
+        url = urllib.parse.urljoin(
+            f"{endpoint.scheme}://{endpoint.netloc}{path}", location
+        )
+        target = urllib.parse.urlsplit(url)
+        # Connections are pooled for a single server, other servers are not followed
+        if (target.scheme, target.netloc) != (endpoint.scheme, endpoint.netloc):
+            return None
+        path = target.path or "/"
+        if target.query:
+            path += f"?{target.query}"
+        return path
+
+    async def _request(self, method: str, path: str, body: bytes) -> HTTPResponse:
+        for _ in range(HTTP_REDIRECTS_MAX):
+            response = await self._send(method, path, body)
+            location = response.headers.get("location")
+            if response.status not in HTTP_REDIRECT_STATUSES or not location:
+                return response
+            if response.status == 303 and method != "HEAD":
+                method, body = "GET", b""
+            elif response.status in (301, 302) and method not in ("GET", "HEAD"):
+                # Clients turn these into GET requests, which would drop the write
+                return response
+            path_redirected = self._redirect(path, location)
+            if path_redirected is None:
+                return response
+            path = path_redirected
+        return response
+
+    async def _send(self, method: str, path: str, body: bytes) -> HTTPResponse:
+        reuse = True
+        while True:
+            reused = reuse and bool(self._connections)
+            if reused:
+                connection = self._connections.pop()
+            else:
+                connection = await self._connect()
+            try:
+                response, keep_alive = await self._exchange(
+                    connection, method, path, body
+                )
+            except HTTPConnectionStale:
+                self._close(connection)
+                # The server may have dropped an idle keep-alive connection. Only
+                # requests that are safe to repeat are sent again, the server may
+                # have processed the request before closing the connection
+                if reused and method in HTTP_IDEMPOTENT_METHODS:
+                    reuse = False
+                    continue
+                raise
+            except BaseException:
+                self._close(connection)
+                raise
+            if keep_alive:
+                self._connections.append(connection)
+            else:
+                self._close(connection)
+            return response
@@ -1,3 +1,7 @@
+import asyncio
+import functools
+import json
+import threading
 import typing
 import urllib.parse
 
@@ -5,8 +9,267 @@ import attr
 import deserialize  # type: ignore
 import grafana_api.grafana_api  # type: ignore
 import grafana_api.grafana_face  # type: ignore
+import requests
+import requests.adapters
 
+import gdbt.errors
 from gdbt.provider import Provider
+from gdbt.provider.aio import HTTP_OVERLOAD_STATUSES, HTTPClient, proxied
+
+GRAFANA_POOL_SIZE = 100
+GRAFANA_SEARCH_PAGE_SIZE = 1000
+
+_client_lock = threading.RLock()
+
+
+@attr.s
+class AsyncGrafanaAPI:
+    http: HTTPClient = attr.ib()
+    # Synchronous client used through an executor when a proxy is configured
+    fallback: typing.Optional[grafana_api.grafana_api.GrafanaAPI] = attr.ib(
+        default=None
+    )
+    # Completed and in-flight GET requests by path, shared for the whole run.
+    # Bodies are kept encoded, so every reader decodes data of its own
+    _reads: typing.Dict[str, bytes] = attr.ib(init=False, factory=dict)
+    _inflight: typing.Dict[str, asyncio.Future] = attr.ib(init=False, factory=dict)
+    # Memoized dashboard reads by folder uid, empty if Grafana doesn't report it
+    _folders: typing.Dict[str, typing.Set[str]] = attr.ib(init=False, factory=dict)
+
+    @staticmethod
+    def _decode(body: bytes) -> typing.Any:
+        if not body.strip():
+            return None
+        return json.loads(body)
+
+    async def request(
+        self, method: str, path: str, json_data: typing.Any = None
+    ) -> typing.Any:
+        if method != "GET":
+            self.invalidate(path, json_data)
+            try:
+                return self._decode(await self._request(method, path, json_data))
+            finally:
+                self.invalidate(path, json_data)
+        body = self._reads.get(path)
+        if body is None:
+            inflight = self._inflight.get(path)
+            if inflight is None:
+                inflight = asyncio.ensure_future(self._request(method, path))
+                inflight.add_done_callback(functools.partial(self._read_done, path))
+                self._inflight.update({path: inflight})
+            body = typing.cast(bytes, await asyncio.shield(inflight))
+        return self._decode(body)
+
+    def _read_done(self, path: str, future: asyncio.Future) -> None:
+        # Reads invalidated while in flight are not memoized
+        if self._inflight.get(path) is not future:
+            return
+        del self._inflight[path]
+        if future.cancelled() or future.exception() is not None:
+            return
+        body = future.result()
+        self._reads.update({path: body})
+        if path.startswith("/dashboards/uid/"):
+            data = self._decode(body)
+            meta = (data.get("meta") if isinstance(data, dict) else None) or {}
+            folder = str(meta.get("folderUid") or "")
+            self._folders.setdefault(folder, set()).add(path)
+
+    def invalidate(self, path: str, json_data: typing.Any = None) -> None:
+        resource = path.split("?")[0].rstrip("/")
+        uids = {resource.rsplit("/", 1)[-1]}
+        if isinstance(json_data, dict):
+            uids.add(str(json_data.get("uid") or ""))
+            if isinstance(json_data.get("dashboard"), dict):
+                uids.add(str(json_data["dashboard"].get("uid") or ""))
+        uids.discard("")
+        keys_folder: typing.Set[str] = set()
+        if resource.startswith("/folders/"):
+            # Dashboards of a deleted or renamed folder change with it, as well as
+            # those whose folder Grafana doesn't report
+            for folder in (*uids, ""):
+                keys_folder.update(self._folders.pop(folder, set()))
+
+        def stale(key: str) -> bool:
+            return (
+                "?" in key
+                or key.startswith("/folders/id/")
+                or key.rsplit("/", 1)[-1] in uids
+                or key in keys_folder
+            )
+
+        for reads in (self._reads, self._inflight):
+            for key in [key for key in reads if stale(key)]:
+                del reads[key]
+
+    async def _request(
+        self, method: str, path: str, json_data: typing.Any = None
+    ) -> bytes:
+        if self.fallback is not None:
+            runner = getattr(self.fallback, method)
+            loop = asyncio.get_running_loop()
+            limiter = self.http.limiter
+            started = await limiter.acquire()
+            try:
+                data = await loop.run_in_executor(
+                    None, functools.partial(runner, path, json=json_data)
+                )
+            except grafana_api.grafana_api.GrafanaException as exc:
+                limiter.release(
+                    started, overloaded=exc.status_code in HTTP_OVERLOAD_STATUSES
+                )
+                raise
+            except requests.RequestException:
+                limiter.release(started, overloaded=True)
+                raise
+            except BaseException:
+                limiter.release(started, completed=False)
+                raise
+            limiter.release(started)
+            return json.dumps(data).encode()
+        try:
+            response = await self.http.request(method, path, json_data)
+        except (OSError, EOFError, asyncio.TimeoutError) as exc:
+            raise gdbt.errors.GrafanaServerError(
+                f"{method} {path}: {str(exc) or type(exc).__name__}"
+            )
+        if 300 <= response.status < 400:
+            location = response.headers.get("location")
+            raise grafana_api.grafana_api.GrafanaClientError(
+                response.status,
+                response.text,
+                f"Redirect {response.status} to {location} was not followed, "
+                "set the provider endpoint to the URL Grafana is served at",
+            )
+        if response.status >= 400:
+            try:
+                error = response.json()
+            except ValueError:
+                error = response.text
+            message = response.text
+            if isinstance(error, dict) and "message" in error:
+                message = error["message"]
+            if response.status >= 500:
+                raise grafana_api.grafana_api.GrafanaServerError(
+                    response.status,
+                    error,
+                    f"Server Error {response.status}: {message}",
+                )
+            if response.status == 400:
+                raise grafana_api.grafana_api.GrafanaBadInputError(error)
+            if response.status == 401:
+                raise grafana_api.grafana_api.GrafanaUnauthorizedError(error)
+            raise grafana_api.grafana_api.GrafanaClientError(
+                response.status, error, f"Client Error {response.status}: {message}"
+            )
+        return response.body
+
+    async def search(
+        self, type: str, page: int = 1, limit: int = GRAFANA_SEARCH_PAGE_SIZE
+    ) -> typing.Any:
+        query = urllib.parse.urlencode({"type": type, "page": page, "limit": limit})
+        return await self.request("GET", f"/search?{query}")
+
+    async def get_folders(
+        self, page: int = 1, limit: int = GRAFANA_SEARCH_PAGE_SIZE
+    ) -> typing.Any:
+        query = urllib.parse.urlencode({"page": page, "limit": limit})
+        return await self.request("GET", f"/folders?{query}")
+
+    async def get_folder(self, uid: str) -> typing.Any:
+        return await self.request("GET", f"/folders/{uid}")
+
+    async def get_folder_by_id(self, id: int) -> typing.Any:
+        return await self.request("GET", f"/folders/id/{id}")
+
+    async def create_folder(self, title: str, uid: str) -> typing.Any:
+        return await self.request("POST", "/folders", {"title": title, "uid": uid})
+
+    async def update_folder(
+        self, uid: str, title: str, overwrite: bool = False
+    ) -> typing.Any:
+        return await self.request(
+            "PUT", f"/folders/{uid}", {"title": title, "overwrite": overwrite}
+        )
+
+    async def delete_folder(self, uid: str) -> typing.Any:
+        return await self.request("DELETE", f"/folders/{uid}")
+
+    async def get_dashboard(self, uid: str) -> typing.Any:
+        return await self.request("GET", f"/dashboards/uid/{uid}")
+
+    async def update_dashboard(self, dashboard: typing.Any) -> typing.Any:
+        return await self.request("POST", "/dashboards/db", dashboard)
+
+    async def delete_dashboard(self, uid: str) -> typing.Any:
+        return await self.request("DELETE", f"/dashboards/uid/{uid}")
+
+
+@attr.s
+class FolderIndex:
+    """Folder uid to id mapping, loaded once and kept up to date by folder operations"""
+
+    client: AsyncGrafanaAPI = attr.ib()
+    _ids: typing.Dict[str, int] = attr.ib(init=False, factory=dict)
+    _uids: typing.Dict[int, str] = attr.ib(init=False, factory=dict)
+    _loaded: bool = attr.ib(init=False, default=False)
+    _loading: typing.Optional[asyncio.Future] = attr.ib(init=False, default=None)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    async def _load(self) -> None:
+        folders: typing.Dict[str, typing.Any] = {}
+        page = 1
+        while True:
+            results = await self.client.get_folders(page)
+            # Older Grafana versions ignore the page parameter
+            if all(folder["uid"] in folders for folder in results):
+                break
+            folders.update({folder["uid"]: folder for folder in results})
+            if len(results) < GRAFANA_SEARCH_PAGE_SIZE:
+                break
+            page += 1
+        self.fill(folders.values())
+
+    async def load(self) -> None:
+        if self._loaded:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        loading = self._loading
+        try:
+            await asyncio.shield(loading)
+        except BaseException:
+            if self._loading is loading:
+                self._loading = None
+            raise
+
+    def fill(self, folders: typing.Iterable[typing.Dict[str, typing.Any]]) -> None:
+        with self._lock:
+            for folder in folders:
+                self._ids.update({folder["uid"]: folder["id"]})
+                self._uids.update({folder["id"]: folder["uid"]})
+            self._loaded = True
+
+    def add(self, uid: str, id: int) -> None:
+        with self._lock:
+            self._uids.pop(self._ids.get(uid), None)  # type: ignore
+            self._ids.update({uid: id})
+            self._uids.update({id: uid})
+
+    def remove(self, uid: str) -> None:
+        with self._lock:
+            self._uids.pop(self._ids.pop(uid, None), None)  # type: ignore
+
+    async def id(self, uid: str) -> typing.Optional[int]:
+        await self.load()
+        with self._lock:
+            return self._ids.get(uid)
+
+    async def uid(self, id: int) -> typing.Optional[str]:
+        await self.load()
+        with self._lock:
+            return self._uids.get(id)
 
 
 @deserialize.downcast_identifier(Provider, "grafana")
@@ -14,17 +277,94 @@ from gdbt.provider import Provider
 class GrafanaProvider(Provider):
     endpoint: str = attr.ib()
     token: typing.Optional[str] = attr.ib()
-    timeout: typing.Optional[int] = attr.ib(default=5)
+    timeout: typing.Optional[typing.Union[int, float]] = attr.ib(default=5)
+    connect_timeout: typing.Optional[typing.Union[int, float]] = attr.ib(default=None)
+    pool_size: typing.Optional[int] = attr.ib(default=None)
+    adaptive_concurrency: typing.Optional[bool] = attr.ib(default=None)
 
     @property
     def client(self) -> grafana_api.grafana_face.GrafanaFace:
+        client = self.__dict__.get("_client")
+        if client is not None:
+            return client
+        with _client_lock:
+            client = self.__dict__.get("_client")
+            if client is None:
+                client = self._make_client()
+                self.__dict__["_client"] = client
+        return client
+
+    @property
+    def async_client(self) -> AsyncGrafanaAPI:
+        client = self.__dict__.get("_async_client")
+        if client is not None:
+            return client
+        with _client_lock:
+            client = self.__dict__.get("_async_client")
+            if client is None:
+                client = self._make_async_client()
+                self.__dict__["_async_client"] = client
+        return client
+
+    @property
+    def concurrency_limit(self) -> float:
+        """Current limit of in-flight requests, adjusted at runtime"""
+        return self.async_client.http.limiter.limit
+
+    @property
+    def folder_index(self) -> FolderIndex:
+        index = self.__dict__.get("_folder_index")
+        if index is not None:
+            return index
+        with _client_lock:
+            index = self.__dict__.get("_folder_index")
+            if index is None:
+                index = FolderIndex(self.async_client)
+                self.__dict__["_folder_index"] = index
+        return index
+
+    def _make_async_client(self) -> AsyncGrafanaAPI:
+        # Keeps IPv6 brackets and the path prefix of a Grafana served on a sub-path
+        url = self.endpoint.rstrip("/") + "/api"
+        headers = {}
+        if self.token:
+            headers.update({"Authorization": f"Bearer {self.token}"})
+        http = HTTPClient(
+            url,
+            headers=headers,
+            limit=self.pool_size or GRAFANA_POOL_SIZE,
+            timeout=self.timeout,
+            connect_timeout=self.connect_timeout,
+            adaptive=self.adaptive_concurrency is not False,
+        )
+        fallback = None
+        if proxied(url):
+            fallback = self.client.api
+        return AsyncGrafanaAPI(http, fallback)
+
+    def _make_client(self) -> grafana_api.grafana_face.GrafanaFace:
         endpoint = urllib.parse.urlparse(self.endpoint)
         port = endpoint.port or {"http": 80, "https": 443}.get(endpoint.scheme, None)
+        timeout: typing.Any = self.timeout
+        if self.connect_timeout is not None:
+            timeout = (self.connect_timeout, self.timeout)
         client = grafana_api.grafana_face.GrafanaFace(
             host=endpoint.hostname,
             port=port,
             protocol=endpoint.scheme,
             auth=self.token,
-            timeout=self.timeout,
+            timeout=timeout,
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size or GRAFANA_POOL_SIZE
         )
+        client.api.s.mount("http://", adapter)
+        client.api.s.mount("https://", adapter)
         return client
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        state = dict(self.__dict__)
+        state.pop("_client", None)
+        state.pop("_async_client", None)
+        state.pop("_folder_index", None)
+        return state
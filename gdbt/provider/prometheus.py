@@ -1,5 +1,14 @@
+import codecs
+import collections
+import concurrent.futures
+import functools
 import hashlib
+import json
+import re
+import threading
+import time
 import typing
+import urllib.parse
 
 import attr
 import deserialize  # type: ignore
@@ -9,8 +18,138 @@ import requests
 from gdbt.dynamic import Evaluation
 from gdbt.provider import EvaluationProvider, Provider
 
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_RESULT_START = re.compile(r'"result"\s*:\s*\[')
+STREAM_RESULT_TYPE = re.compile(r'"resultType"\s*:\s*"(\w+)"')
+STREAM_TYPES = ("vector", "matrix")
+HEDGE_DELAY = 1.0
+HEDGE_PERCENTILE = 95
+HEDGE_SAMPLES_MIN = 10
+HEDGE_THREADS = 64
+LATENCY_WINDOW = 100
 
 http = requests.Session()
+json_decoder = json.JSONDecoder()
+hedge_pool = concurrent.futures.ThreadPoolExecutor(HEDGE_THREADS)
+
+
+@attr.s
+class EndpointStats:
+    latencies: typing.Deque[float] = attr.ib(
+        factory=lambda: collections.deque(maxlen=LATENCY_WINDOW)
+    )
+    requests: int = attr.ib(default=0)
+    errors: int = attr.ib(default=0)
+    _lock: threading.Lock = attr.ib(factory=threading.Lock, repr=False)
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+
+    def failure(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+
+    def percentile(
+        self, percentile: float, samples_min: int = 1
+    ) -> typing.Optional[float]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies or len(latencies) < samples_min:
+            return None
+        index = min(len(latencies) - 1, int(percentile / 100 * len(latencies)))
+        return latencies[index]
+
+
+_endpoint_stats: typing.Dict[str, EndpointStats] = {}
+_endpoint_stats_lock = threading.Lock()
+
+
+def endpoint_stats(endpoint: str) -> EndpointStats:
+    with _endpoint_stats_lock:
+        stats = _endpoint_stats.setdefault(endpoint, EndpointStats())
+    return stats
+
+
+def _close_response(future: concurrent.futures.Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    future.result().close()
+
+
+@functools.lru_cache(maxsize=None)
+def label_path(label: str) -> typing.Any:
+    path = jsonpath_ng.parse(f"$.metric.{label}")
+    return path
+
+
+def _read_results(
+    buffer: str,
+    chunks: typing.Iterator[bytes],
+    decoder: codecs.IncrementalDecoder,
+) -> typing.Generator[typing.Any, None, None]:
+    """Decode the whole response, for results that are not a list of series"""
+    parts = [buffer]
+    parts.extend(decoder.decode(chunk) for chunk in chunks)
+    parts.append(decoder.decode(b"", final=True))
+    answer = json.loads("".join(parts))
+    results = (answer.get("data") or {}).get("result") or []
+    if isinstance(results, list):
+        yield from results
+
+
+def stream_results(
+    chunks: typing.Iterable[bytes],
+) -> typing.Generator[typing.Any, None, None]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    started = False
+    exhausted = False
+    while True:
+        if not started:
+            match = STREAM_RESULT_START.search(buffer)
+            if match:
+                result_type = STREAM_RESULT_TYPE.search(buffer, 0, match.start())
+                if result_type is None or result_type.group(1) not in STREAM_TYPES:
+                    # Scalars and strings are not series, nothing to stream
+                    yield from _read_results(buffer, chunks, decoder)
+                    return
+                started = True
+                position = match.end()
+                continue
+        else:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer):
+                if buffer[position] == "]":
+                    return
+                try:
+                    item, position = json_decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise
+                else:
+                    yield item
+                    continue
+        if exhausted:
+            if not started:
+                yield from _read_results(buffer, chunks, decoder)
+                return
+            raise json.JSONDecodeError("Unterminated result array", buffer, position)
+        chunk = next(chunks, None)
+        if started:
+            # Drop decoded items once per chunk rather than after every item
+            buffer = buffer[position:]
+            position = 0
+        if chunk is None:
+            exhausted = True
+            buffer += decoder.decode(b"", final=True)
+            continue
+        buffer += decoder.decode(chunk)
 
 
 @deserialize.downcast_identifier(Provider, "prometheus")
@@ -20,24 +159,129 @@ class PrometheusProvider(EvaluationProvider):
     timeout: typing.Optional[int] = attr.ib(default=5)
     http_proxy: typing.Optional[str] = attr.ib(default=None)
     https_proxy: typing.Optional[str] = attr.ib(default=None)
+    concurrency: typing.Optional[int] = attr.ib(default=None)
+    replicas: typing.Optional[typing.List[str]] = attr.ib(default=None)
+    hedge_percentile: typing.Optional[typing.Union[int, float]] = attr.ib(default=None)
+    hedge_delay: typing.Optional[typing.Union[int, float]] = attr.ib(default=None)
 
     @property
     def client(self) -> None:
         return None
 
-    def query(self, query: str) -> typing.List[typing.Any]:
-        url = self.endpoint.rstrip("/") + "/api/v1/query"
-        response = http.get(
-            url,
-            params={"query": query},
-            timeout=self.timeout,
-            proxies={
-                "http": self.http_proxy,
-                "https": self.https_proxy or self.http_proxy,
-            },
+    @property
+    def stats(self) -> typing.Dict[str, EndpointStats]:
+        stats = {
+            endpoint: endpoint_stats(endpoint)
+            for endpoint in [self.endpoint, *(self.replicas or [])]
+        }
+        return stats
+
+    @property
+    def endpoints(self) -> typing.List[str]:
+        endpoints = sorted(
+            self.stats,
+            key=lambda endpoint: endpoint_stats(endpoint).percentile(50) or 0.0,
+        )
+        return endpoints
+
+    def threshold(self, endpoint: str) -> float:
+        threshold = endpoint_stats(endpoint).percentile(
+            self.hedge_percentile or HEDGE_PERCENTILE, HEDGE_SAMPLES_MIN
         )
-        response.raise_for_status()
-        answer = response.json().get("data").get("result")
+        if threshold is None:
+            threshold = (
+                self.hedge_delay if self.hedge_delay is not None else HEDGE_DELAY
+            )
+        return threshold
+
+    def _request(
+        self, endpoint: str, path: str, params: typing.Dict[str, typing.Any]
+    ) -> requests.Response:
+        stats = endpoint_stats(endpoint)
+        started = time.monotonic()
+        try:
+            response = http.get(
+                endpoint.rstrip("/") + path,
+                params=params,
+                timeout=self.timeout,
+                proxies={
+                    "http": self.http_proxy,
+                    "https": self.https_proxy or self.http_proxy,
+                },
+                stream=True,
+            )
+        except requests.RequestException:
+            stats.failure()
+            raise
+        try:
+            response.raise_for_status()
+        except requests.RequestException:
+            stats.failure()
+            response.close()
+            raise
+        stats.record(time.monotonic() - started)
+        return response
+
+    def get(self, path: str, params: typing.Dict[str, typing.Any]) -> requests.Response:
+        endpoints = self.endpoints
+        if len(endpoints) == 1:
+            return self._request(endpoints[0], path, params)
+        pending: typing.Dict[concurrent.futures.Future, str] = {}
+        error: typing.Optional[requests.RequestException] = None
+
+        def submit() -> None:
+            endpoint = endpoints.pop(0)
+            pending.update(
+                {hedge_pool.submit(self._request, endpoint, path, params): endpoint}
+            )
+
+        submit()
+        while pending:
+            timeout = None
+            if endpoints:
+                timeout = self.threshold(list(pending.values())[-1])
+            done, _ = concurrent.futures.wait(
+                pending, timeout, concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                submit()
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    response = future.result()
+                except requests.RequestException as exc:
+                    error = exc
+                    continue
+                for future_pending in pending:
+                    future_pending.cancel()
+                    future_pending.add_done_callback(_close_response)
+                return response
+            if endpoints:
+                submit()
+        raise typing.cast(requests.RequestException, error)
+
+    def query(self, query: str) -> typing.List[typing.Any]:
+        answer = list(self.query_stream(query))
+        return answer
+
+    def query_stream(self, query: str) -> typing.Generator[typing.Any, None, None]:
+        with self.get("/api/v1/query", {"query": query}) as response:
+            yield from stream_results(response.iter_content(STREAM_CHUNK_SIZE))
+
+    def label_values(
+        self,
+        label: str,
+        match: typing.Optional[typing.List[str]] = None,
+        window: typing.Optional[int] = None,
+    ) -> typing.List[str]:
+        path = f"/api/v1/label/{urllib.parse.quote(label, safe='')}/values"
+        params: typing.Dict[str, typing.Any] = {"match[]": match or []}
+        if window:
+            end = time.time()
+            params.update({"start": end - window, "end": end})
+        with self.get(path, params) as response:
+            answer = response.json().get("data") or []
         return answer
 
 
@@ -46,16 +290,85 @@ class PrometheusProvider(EvaluationProvider):
 class PrometheusEvaluation(Evaluation):
     metric: str = attr.ib()
     label: str = attr.ib()
+    item_label: typing.Optional[str] = attr.ib(default=None)
+
+    @property
+    def grouped(self) -> bool:
+        return self.item_label is not None
+
+    @staticmethod
+    def _append(
+        values: typing.List[typing.Any], values_seen: typing.Set[str], value: typing.Any
+    ) -> None:
+        value_key = json.dumps(value, sort_keys=True)
+        if value_key in values_seen:
+            return
+        values_seen.add(value_key)
+        values.append(value)
 
     def evaluate(self, provider: EvaluationProvider) -> typing.Any:
-        filter = jsonpath_ng.parse(f"$[*].metric.{self.label}")
-        metric_values = provider.query(self.metric)
-        values = [item.value for item in filter.find(metric_values)]
+        if self.grouped:
+            return self.evaluate_grouped(provider)
+        filter = label_path(self.label)
+        metric_values = typing.cast(PrometheusProvider, provider).query_stream(
+            self.metric
+        )
+        values: typing.List[typing.Any] = []
+        values_seen: typing.Set[str] = set()
+        for metric_value in metric_values:
+            for item in filter.find(metric_value):
+                self._append(values, values_seen, item.value)
+        return values
+
+    def evaluate_grouped(
+        self, provider: EvaluationProvider
+    ) -> typing.Dict[str, typing.List[typing.Any]]:
+        item_label = typing.cast(str, self.item_label)
+        filter = label_path(self.label)
+        filter_item = label_path(item_label)
+        metric_values = typing.cast(PrometheusProvider, provider).query_stream(
+            f"group by ({item_label}, {self.label}) ({self.metric})"
+        )
+        values: typing.Dict[str, typing.List[typing.Any]] = {}
+        values_seen: typing.Dict[str, typing.Set[str]] = {}
+        for metric_value in metric_values:
+            for item in filter_item.find(metric_value):
+                item_key = str(item.value)
+                values.setdefault(item_key, [])
+                values_seen.setdefault(item_key, set())
+                for value in filter.find(metric_value):
+                    self._append(values[item_key], values_seen[item_key], value.value)
         return values
 
     @property
     def hash(self) -> str:
         data = self.source + self.metric + self.label
+        if self.item_label is not None:
+            data += "\0" + self.item_label
+        md5 = hashlib.md5()
+        md5.update(data.encode())
+        digest = md5.hexdigest()
+        return digest
+
+
+@deserialize.downcast_identifier(Evaluation, "prometheus_label_values")
+@attr.s
+class PrometheusLabelValuesEvaluation(Evaluation):
+    label: str = attr.ib()
+    match: typing.Optional[typing.List[str]] = attr.ib(default=None)
+    window: typing.Optional[int] = attr.ib(default=None)
+
+    def evaluate(self, provider: EvaluationProvider) -> typing.Any:
+        provider = typing.cast(PrometheusProvider, provider)
+        values = sorted(set(provider.label_values(self.label, self.match, self.window)))
+        return values
+
+    @property
+    def hash(self) -> str:
+        data = "\0".join(
+            ["label_values", self.source, self.label, str(self.window)]
+            + (self.match or [])
+        )
         md5 = hashlib.md5()
         md5.update(data.encode())
         digest = md5.hexdigest()
@@ -1,16 +1,22 @@
 import abc
-import concurrent.futures
+import asyncio
+import functools
+import hashlib
+import json
 import typing
 
 import attr
-import backoff  # type: ignore
 import deserialize  # type: ignore
 import grafana_api.grafana_api  # type: ignore
 
 import gdbt.errors
 from gdbt.code import Configuration
+from gdbt.provider.aio import run, schedule
+from gdbt.provider.grafana import GRAFANA_SEARCH_PAGE_SIZE
+from gdbt.resource.retry import retrying
 
 IGNORED_KEYS = ("id", "uid", "version")
+SEARCH_TYPES = {"folder": "dash-folder", "dashboard": "dash-db"}
 
 ResourceGroup = typing.NewType("ResourceGroup", typing.Dict[str, "Resource"])
 ResourceMeta = typing.NewType("ResourceMeta", typing.Dict[str, str])
@@ -23,9 +29,13 @@ class Resource(abc.ABC):
     grafana: str = attr.ib()
     uid: str = attr.ib()
     model: typing.Dict[str, typing.Any] = attr.ib()
+    # Grafana version of the resource when it was read or written, if known
+    revision: typing.Optional[int] = attr.ib(
+        default=None, eq=False, repr=False, kw_only=True
+    )
 
     @abc.abstractclassmethod
-    def create(
+    async def create_async(
         cls,
         grafana: str,
         uid: str,
@@ -34,7 +44,7 @@ class Resource(abc.ABC):
         pass
 
     @abc.abstractclassmethod
-    def get(
+    async def get_async(
         cls,
         grafana: str,
         uid: str,
@@ -43,7 +53,7 @@ class Resource(abc.ABC):
         pass
 
     @abc.abstractclassmethod
-    def exists(
+    async def exists_async(
         cls,
         grafana: str,
         uid: str,
@@ -51,12 +61,22 @@ class Resource(abc.ABC):
     ) -> bool:
         pass
 
+    @abc.abstractclassmethod
+    async def from_inventory_async(
+        cls,
+        inventory: "Inventory",
+        uid: str,
+        configuration: Configuration,
+        desired: typing.Optional["Resource"] = None,
+    ) -> "Resource":
+        pass
+
     @abc.abstractmethod
-    def id(self, configuration: Configuration) -> int:
+    async def id_async(self, configuration: Configuration) -> int:
         pass
 
     @abc.abstractmethod
-    def update(
+    async def update_async(
         self,
         model: typing.Dict[str, typing.Any],
         configuration: Configuration,
@@ -64,9 +84,34 @@ class Resource(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def delete(self, configuration: Configuration) -> None:
+    async def delete_async(self, configuration: Configuration) -> None:
         pass
 
+    @classmethod
+    def create(cls, *args: typing.Any, **kwargs: typing.Any) -> "Resource":
+        return run(cls.create_async(*args, **kwargs))
+
+    @classmethod
+    def get(cls, *args: typing.Any, **kwargs: typing.Any) -> "Resource":
+        return run(cls.get_async(*args, **kwargs))
+
+    @classmethod
+    def exists(cls, *args: typing.Any, **kwargs: typing.Any) -> bool:
+        return run(cls.exists_async(*args, **kwargs))
+
+    def id(self, configuration: Configuration) -> int:
+        return run(self.id_async(configuration))
+
+    def update(
+        self,
+        model: typing.Dict[str, typing.Any],
+        configuration: Configuration,
+    ) -> "Resource":
+        return run(self.update_async(model, configuration))
+
+    def delete(self, configuration: Configuration) -> None:
+        return run(self.delete_async(configuration))
+
     @property
     @abc.abstractmethod
     def serialized(self) -> typing.Dict[str, typing.Any]:
@@ -76,6 +121,12 @@ class Resource(abc.ABC):
     def _kind(self) -> str:
         return type(self).__name__.lower()
 
+    @property
+    def digest(self) -> str:
+        serialized = json.dumps(self.serialized, sort_keys=True)
+        digest = hashlib.sha256(serialized.encode()).hexdigest()
+        return digest
+
     @staticmethod
     def client(grafana: str, configuration: Configuration) -> typing.Any:
         try:
@@ -100,10 +151,8 @@ class Resource(abc.ABC):
 @deserialize.downcast_identifier(Resource, "folder")
 class Folder(Resource):
     @classmethod
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaServerError, max_time=60
-    )
-    def create(  # type: ignore
+    @retrying("write")
+    async def create_async(  # type: ignore
         cls,
         grafana: str,
         uid: str,
@@ -113,7 +162,9 @@ class Folder(Resource):
         try:
             model_stripped = cls._model_strip(model)
             title = model_stripped["title"]
-            cls.client(grafana, configuration).client.folder.create_folder(title, uid)
+            created = await cls.client(
+                grafana, configuration
+            ).async_client.create_folder(title, uid)
         except KeyError:
             raise gdbt.errors.DataError("Folder model missing 'title' key")
         except grafana_api.grafana_api.GrafanaException as exc:
@@ -121,43 +172,82 @@ class Folder(Resource):
                 raise gdbt.errors.GrafanaServerError(exc.message)
             if exc.status_code != 412:
                 raise gdbt.errors.GrafanaError(str(exc))
-        folder = cls.get(grafana, uid, configuration)
+            # Already exists, read it back
+            return await cls.get_async(grafana, uid, configuration)
+        cls.client(grafana, configuration).folder_index.add(uid, created["id"])
+        folder = cls(grafana, uid, {"title": created.get("title", title)})
         return folder
 
     @classmethod
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaResourceNotFound, max_time=60
-    )
-    def get(
+    @retrying("refresh")
+    async def get_async(
+        cls,
+        grafana: str,
+        uid: str,
+        configuration: Configuration,
+    ) -> "Folder":
+        return await cls._read_async(grafana, uid, configuration)
+
+    @classmethod
+    @retrying("read_after_write")
+    async def wait_async(
+        cls,
+        grafana: str,
+        uid: str,
+        configuration: Configuration,
+    ) -> "Folder":
+        """Get a folder that may have just been created and not be visible yet"""
+        return await cls._read_async(grafana, uid, configuration)
+
+    @classmethod
+    async def _read_async(
         cls,
         grafana: str,
         uid: str,
         configuration: Configuration,
     ) -> "Folder":
         try:
-            title = cls.client(grafana, configuration).client.folder.get_folder(uid)[
-                "title"
-            ]
+            folder = await cls.client(grafana, configuration).async_client.get_folder(
+                uid
+            )
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
+                cls.client(grafana, configuration).folder_index.remove(uid)
                 raise gdbt.errors.GrafanaResourceNotFound(uid)
             if exc.status_code in (429, 500, 503, 504):
                 raise gdbt.errors.GrafanaServerError(exc.message)
             raise gdbt.errors.GrafanaError(str(exc))
-        model = {"title": title}
+        cls.client(grafana, configuration).folder_index.add(uid, folder["id"])
+        model = {"title": folder["title"]}
         model_stripped = cls._model_strip(model)
         folder = cls(grafana, uid, model_stripped)
         return folder
 
     @classmethod
-    def exists(
+    async def from_inventory_async(
+        cls,
+        inventory: "Inventory",
+        uid: str,
+        configuration: Configuration,
+        desired: typing.Optional[Resource] = None,
+    ) -> "Folder":
+        try:
+            item = inventory.folders[uid]
+        except KeyError:
+            raise gdbt.errors.GrafanaResourceNotFound(uid)
+        model = {"title": item["title"]}
+        folder = cls(inventory.grafana, uid, model)
+        return folder
+
+    @classmethod
+    async def exists_async(
         cls,
         grafana: str,
         uid: str,
         configuration: Configuration,
     ) -> bool:
         try:
-            cls.client(grafana, configuration).client.folder.get_folder(uid)
+            await cls.client(grafana, configuration).async_client.get_folder(uid)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 return False
@@ -167,17 +257,17 @@ class Folder(Resource):
         return True
 
     @classmethod
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaResourceNotFound, max_time=60
-    )
-    def get_by_id(
+    @retrying("refresh")
+    async def get_by_id_async(
         cls,
         grafana: str,
         id: int,
         configuration: Configuration,
     ) -> "Folder":
         try:
-            data = cls.client(grafana, configuration).client.folder.get_folder_by_id(id)
+            data = await cls.client(
+                grafana, configuration
+            ).async_client.get_folder_by_id(id)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 raise gdbt.errors.GrafanaResourceNotFound(f"ID: {id}")
@@ -187,26 +277,77 @@ class Folder(Resource):
         model = {"title": data["title"]}
         model_stripped = cls._model_strip(model)
         uid = data["uid"]
+        cls.client(grafana, configuration).folder_index.add(uid, id)
         folder = cls(grafana, uid, model_stripped)
         return folder
 
-    def id(self, configuration: Configuration) -> int:
+    @classmethod
+    def get_by_id(
+        cls,
+        grafana: str,
+        id: int,
+        configuration: Configuration,
+    ) -> "Folder":
+        return run(cls.get_by_id_async(grafana, id, configuration))
+
+    @classmethod
+    async def resolve_id_async(
+        cls,
+        grafana: str,
+        uid: str,
+        configuration: Configuration,
+    ) -> int:
+        index = cls.client(grafana, configuration).folder_index
         try:
-            id = self.client(self.grafana, configuration).client.folder.get_folder(
-                self.uid
-            )["id"]
+            id = await index.id(uid)
+        except grafana_api.grafana_api.GrafanaException as exc:
+            if exc.status_code in (429, 500, 503, 504):
+                raise gdbt.errors.GrafanaServerError(exc.message)
+            raise gdbt.errors.GrafanaError(str(exc))
+        if id is None:
+            # Not in the index yet, wait for the folder to appear
+            await cls.wait_async(grafana, uid, configuration)
+            id = await index.id(uid)
+        if id is None:
+            raise gdbt.errors.GrafanaResourceNotFound(uid)
+        return id
+
+    @classmethod
+    async def resolve_uid_async(
+        cls,
+        grafana: str,
+        id: int,
+        configuration: Configuration,
+    ) -> str:
+        index = cls.client(grafana, configuration).folder_index
+        try:
+            uid = await index.uid(id)
+        except grafana_api.grafana_api.GrafanaException as exc:
+            if exc.status_code in (429, 500, 503, 504):
+                raise gdbt.errors.GrafanaServerError(exc.message)
+            raise gdbt.errors.GrafanaError(str(exc))
+        if uid is None:
+            folder = await cls.get_by_id_async(grafana, id, configuration)
+            uid = folder.uid
+        return uid
+
+    async def id_async(self, configuration: Configuration) -> int:
+        try:
+            folder = await self.client(
+                self.grafana, configuration
+            ).async_client.get_folder(self.uid)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 raise gdbt.errors.GrafanaResourceNotFound(self.uid)
             if exc.status_code in (429, 500, 503, 504):
                 raise gdbt.errors.GrafanaServerError(exc.message)
             raise gdbt.errors.GrafanaError(str(exc))
+        id = folder["id"]
+        self.client(self.grafana, configuration).folder_index.add(self.uid, id)
         return id
 
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaServerError, max_time=60
-    )
-    def update(
+    @retrying("write")
+    async def update_async(
         self,
         model: typing.Dict[str, typing.Any],
         configuration: Configuration,
@@ -214,8 +355,11 @@ class Folder(Resource):
         try:
             model_stripped = self._model_strip(model)
             title = model_stripped["title"]
-            self.client(self.grafana, configuration).client.folder.update_folder(
-                self.uid, title, overwrite=True
+            updated = await self.client(
+                self.grafana, configuration
+            ).async_client.update_folder(self.uid, title, overwrite=True)
+            self.client(self.grafana, configuration).folder_index.add(
+                self.uid, updated["id"]
             )
             return self
         except KeyError:
@@ -227,20 +371,20 @@ class Folder(Resource):
                 raise gdbt.errors.GrafanaServerError(exc.message)
             raise gdbt.errors.GrafanaError(str(exc))
 
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaServerError, max_time=60
-    )
-    def delete(self, configuration: Configuration) -> None:
+    @retrying("write")
+    async def delete_async(self, configuration: Configuration) -> None:
         try:
-            self.client(self.grafana, configuration).client.folder.delete_folder(
+            await self.client(self.grafana, configuration).async_client.delete_folder(
                 self.uid
             )
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
+                self.client(self.grafana, configuration).folder_index.remove(self.uid)
                 return
             if exc.status_code in (429, 500, 503, 504):
                 raise gdbt.errors.GrafanaServerError(exc.message)
             raise gdbt.errors.GrafanaError(str(exc))
+        self.client(self.grafana, configuration).folder_index.remove(self.uid)
 
     @property
     def serialized(self) -> typing.Dict[str, typing.Any]:
@@ -260,10 +404,8 @@ class Dashboard(Resource):
     folder: str = attr.ib()
 
     @classmethod
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaServerError, max_time=60
-    )
-    def create(  # type: ignore
+    @retrying("write")
+    async def create_async(  # type: ignore
         cls,
         grafana: str,
         uid: str,
@@ -272,34 +414,52 @@ class Dashboard(Resource):
         configuration: Configuration,
     ) -> "Dashboard":
         model_stripped = cls._model_strip(model)
-        model_stripped.update({"id": None, "uid": uid, "version": 1})
+        saved = await cls._upsert(grafana, uid, model_stripped, folder, configuration)
+        dashboard = cls(
+            grafana, uid, model_stripped, folder, revision=saved.get("version")
+        )
+        return dashboard
+
+    @classmethod
+    async def _upsert(
+        cls,
+        grafana: str,
+        uid: str,
+        model: typing.Dict[str, typing.Any],
+        folder: str,
+        configuration: Configuration,
+    ) -> typing.Dict[str, typing.Any]:
+        # Overwrite by uid, Grafana assigns id and version itself
         meta = {
-            "dashboard": model_stripped,
-            "folderId": Folder.get(grafana, folder, configuration).id(configuration),
+            "dashboard": {**model, "id": None, "uid": uid},
+            "folderId": await Folder.resolve_id_async(grafana, folder, configuration),
             "overwrite": True,
         }
         try:
-            cls.client(grafana, configuration).client.dashboard.update_dashboard(meta)
+            saved = await cls.client(
+                grafana, configuration
+            ).async_client.update_dashboard(meta)
         except grafana_api.grafana_api.GrafanaException as exc:
+            if exc.status_code == 404:
+                raise gdbt.errors.GrafanaResourceNotFound(uid)
             if exc.status_code in (429, 500, 503, 504):
                 raise gdbt.errors.GrafanaServerError(exc.message)
             raise gdbt.errors.GrafanaError(str(exc))
-        return cls.get(grafana, uid, configuration)
+        return saved
 
     @classmethod
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaResourceNotFound, max_time=60
-    )
-    def get(
+    @retrying("refresh")
+    async def get_async(
         cls,
         grafana: str,
         uid: str,
         configuration: Configuration,
+        folder: typing.Optional[str] = None,
     ) -> "Dashboard":
         try:
-            dashboard = cls.client(
+            dashboard = await cls.client(
                 grafana, configuration
-            ).client.dashboard.get_dashboard(uid)
+            ).async_client.get_dashboard(uid)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 raise gdbt.errors.GrafanaResourceNotFound(uid)
@@ -308,21 +468,57 @@ class Dashboard(Resource):
             raise gdbt.errors.GrafanaError(str(exc))
         model = dashboard["dashboard"]
         model_stripped = cls._model_strip(model)
-        folder = Folder.get_by_id(
-            grafana, dashboard["meta"]["folderId"], configuration
-        ).uid
-        dashboard = cls(grafana, uid, model_stripped, folder)
+        if folder is None:
+            folder = await Folder.resolve_uid_async(
+                grafana, dashboard["meta"]["folderId"], configuration
+            )
+        dashboard = cls(
+            grafana, uid, model_stripped, folder, revision=model.get("version")
+        )
         return dashboard
 
     @classmethod
-    def exists(
+    async def from_inventory_async(
+        cls,
+        inventory: "Inventory",
+        uid: str,
+        configuration: Configuration,
+        desired: typing.Optional[Resource] = None,
+    ) -> "Dashboard":
+        try:
+            item = inventory.dashboards[uid]
+        except KeyError:
+            raise gdbt.errors.GrafanaResourceNotFound(uid)
+        folder = inventory.folder_uid(item)
+        # Unchanged since the last apply, as recorded in the state digest and
+        # the Grafana version, search results without versions are fetched
+        if (
+            isinstance(desired, Dashboard)
+            and inventory.digests.get(uid) == desired.digest
+            and desired.folder == folder
+            and desired.model.get("title") == item.get("title")
+            and item.get("version") is not None
+            and item.get("version") == inventory.revisions.get(uid)
+        ):
+            dashboard = cls(
+                inventory.grafana,
+                uid,
+                desired.model.copy(),
+                folder,
+                revision=inventory.revisions.get(uid),
+            )
+            return dashboard
+        return await cls.get_async(inventory.grafana, uid, configuration, folder)
+
+    @classmethod
+    async def exists_async(
         cls,
         grafana: str,
         uid: str,
         configuration: Configuration,
     ) -> bool:
         try:
-            cls.client(grafana, configuration).client.dashboard.get_dashboard(uid)
+            await cls.client(grafana, configuration).async_client.get_dashboard(uid)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 return False
@@ -331,11 +527,11 @@ class Dashboard(Resource):
             raise gdbt.errors.GrafanaError(str(exc))
         return True
 
-    def id(self, configuration: Configuration) -> int:
+    async def id_async(self, configuration: Configuration) -> int:
         try:
-            dashboard = self.client(
+            dashboard = await self.client(
                 self.grafana, configuration
-            ).client.dashboard.get_dashboard(self.uid)
+            ).async_client.get_dashboard(self.uid)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 raise gdbt.errors.GrafanaResourceNotFound(self.uid)
@@ -345,11 +541,11 @@ class Dashboard(Resource):
         id = dashboard["dashboard"]["id"]
         return id
 
-    def version(self, configuration: Configuration) -> int:
+    async def version_async(self, configuration: Configuration) -> int:
         try:
-            dashboard = self.client(
+            dashboard = await self.client(
                 self.grafana, configuration
-            ).client.dashboard.get_dashboard(self.uid)
+            ).async_client.get_dashboard(self.uid)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 raise gdbt.errors.GrafanaResourceNotFound(self.uid)
@@ -359,49 +555,28 @@ class Dashboard(Resource):
         version = dashboard["dashboard"]["version"]
         return version
 
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaServerError, max_time=60
-    )
-    def update(
+    def version(self, configuration: Configuration) -> int:
+        return run(self.version_async(configuration))
+
+    @retrying("write")
+    async def update_async(
         self,
         model: typing.Dict[str, typing.Any],
         configuration: Configuration,
     ) -> "Dashboard":
-        try:
-            version_new = self.version(configuration) + 1
-        except TypeError:
-            version_new = 1
         model_stripped = self._model_strip(model)
-        model_stripped.update(
-            {"id": self.id(configuration), "uid": self.uid, "version": version_new}
+        saved = await self._upsert(
+            self.grafana, self.uid, model_stripped, self.folder, configuration
         )
-        meta = {
-            "dashboard": model_stripped,
-            "folderId": Folder.get(self.grafana, self.folder, configuration).id(
-                configuration
-            ),
-            "overwrite": True,
-        }
-        try:
-            self.client(self.grafana, configuration).client.dashboard.update_dashboard(
-                meta
-            )
-            return self
-        except grafana_api.grafana_api.GrafanaException as exc:
-            if exc.status_code == 404:
-                raise gdbt.errors.GrafanaResourceNotFound(self.uid)
-            if exc.status_code in (429, 500, 503, 504):
-                raise gdbt.errors.GrafanaServerError(exc.message)
-            raise gdbt.errors.GrafanaError(str(exc))
+        self.revision = saved.get("version")
+        return self
 
-    @backoff.on_exception(
-        backoff.expo, exception=gdbt.errors.GrafanaServerError, max_time=60
-    )
-    def delete(self, configuration: Configuration) -> None:
+    @retrying("write")
+    async def delete_async(self, configuration: Configuration) -> None:
         try:
-            self.client(self.grafana, configuration).client.dashboard.delete_dashboard(
-                self.uid
-            )
+            await self.client(
+                self.grafana, configuration
+            ).async_client.delete_dashboard(self.uid)
         except grafana_api.grafana_api.GrafanaException as exc:
             if exc.status_code == 404:
                 return
@@ -422,21 +597,94 @@ class Dashboard(Resource):
         return representation
 
 
+@attr.s
+class Inventory:
+    grafana: str = attr.ib()
+    folders: typing.Dict[str, typing.Dict[str, typing.Any]] = attr.ib(factory=dict)
+    dashboards: typing.Dict[str, typing.Dict[str, typing.Any]] = attr.ib(factory=dict)
+    digests: typing.Dict[str, str] = attr.ib(factory=dict)
+    revisions: typing.Dict[str, int] = attr.ib(factory=dict)
+
+    @staticmethod
+    async def _search(client: typing.Any, type: str) -> typing.List[typing.Any]:
+        items: typing.Dict[str, typing.Any] = {}
+        page = 1
+        while True:
+            try:
+                results = await client.search(type, page)
+            except grafana_api.grafana_api.GrafanaException as exc:
+                if exc.status_code in (429, 500, 503, 504):
+                    raise gdbt.errors.GrafanaServerError(exc.message)
+                raise gdbt.errors.GrafanaError(str(exc))
+            if all(item["uid"] in items for item in results):
+                return list(items.values())
+            items.update({item["uid"]: item for item in results})
+            if len(results) < GRAFANA_SEARCH_PAGE_SIZE:
+                return list(items.values())
+            page += 1
+
+    @classmethod
+    @retrying("refresh")
+    async def load_async(
+        cls, grafana: str, configuration: Configuration
+    ) -> "Inventory":
+        client = Resource.client(grafana, configuration).async_client
+        folders, dashboards = await asyncio.gather(
+            cls._search(client, SEARCH_TYPES["folder"]),
+            cls._search(client, SEARCH_TYPES["dashboard"]),
+        )
+        Resource.client(grafana, configuration).folder_index.fill(folders)
+        inventory = cls(
+            grafana,
+            {item["uid"]: item for item in folders},
+            {item["uid"]: item for item in dashboards},
+        )
+        return inventory
+
+    def folder_uid(self, item: typing.Dict[str, typing.Any]) -> typing.Optional[str]:
+        if item.get("folderUid"):
+            return item["folderUid"]
+        for folder in self.folders.values():
+            if folder.get("id") == item.get("folderId"):
+                return folder["uid"]
+        return None
+
+
 @attr.s
 class ResourceLoader:
     configuration: Configuration = attr.ib()
 
     RESOURCE_KINDS = {"dashboard": Dashboard, "folder": Folder}
 
-    def load(
-        self, resources_meta: typing.Mapping[str, ResourceGroupMeta]
+    async def load_async(
+        self,
+        resources_meta: typing.Mapping[str, ResourceGroupMeta],
+        resources_desired: typing.Optional[typing.Mapping[str, ResourceGroup]] = None,
     ) -> typing.Dict[str, ResourceGroup]:
-        threads = self.configuration.concurrency.threads
-        pool = concurrent.futures.ThreadPoolExecutor(threads)
-        resources = {}
-        resource_futures = {}
+        grafanas = sorted(
+            {
+                resource_meta["grafana"]
+                for group_meta in resources_meta.values()
+                for resource_meta in group_meta.values()
+            }
+        )
+        inventories: typing.Dict[str, Inventory] = {}
+        # The inventory is only used to skip unchanged dashboards
+        if resources_desired is not None:
+            inventories = dict(
+                zip(
+                    grafanas,
+                    await asyncio.gather(
+                        *(
+                            Inventory.load_async(grafana, self.configuration)
+                            for grafana in grafanas
+                        )
+                    ),
+                )
+            )
+        resource_names = []
+        resource_jobs = []
         for group_name, group_meta in resources_meta.items():
-            resource_group_futures = {}
             for resource_name, resource_meta in group_meta.items():
                 try:
                     resource_cls = typing.cast(
@@ -446,25 +694,58 @@ class ResourceLoader:
                     raise gdbt.errors.ConfigError(
                         f"Invalid resource kind: {resource_meta['kind']}"
                     )
-                resource_future = pool.submit(
-                    resource_cls.get,
-                    resource_meta["grafana"],
+                resource_names.append((group_name, resource_name))
+                if resources_desired is None:
+                    resource_job = functools.partial(
+                        resource_cls.get_async,
+                        resource_meta["grafana"],
+                        resource_meta["uid"],
+                        self.configuration,
+                    )
+                    resource_jobs.append((resource_meta["grafana"], resource_job))
+                    continue
+                inventory = inventories[resource_meta["grafana"]]
+                if resource_meta.get("digest"):
+                    inventory.digests.update(
+                        {resource_meta["uid"]: resource_meta["digest"]}
+                    )
+                if resource_meta.get("version"):
+                    inventory.revisions.update(
+                        {resource_meta["uid"]: int(resource_meta["version"])}
+                    )
+                group_desired = resources_desired.get(group_name) or ResourceGroup({})
+                desired = group_desired.get(resource_name)
+                resource_job = functools.partial(
+                    resource_cls.from_inventory_async,
+                    inventory,
                     resource_meta["uid"],
                     self.configuration,
+                    desired,
                 )
-                resource_group_futures.update({resource_name: resource_future})
-            resource_futures.update({group_name: resource_group_futures})
-        for group_name, group_futures in resource_futures.items():
-            group_resources = {}
-            for resource_name, resource_future in group_futures.items():
-                exc = resource_future.exception()
-                if isinstance(exc, gdbt.errors.GrafanaResourceNotFound):
-                    continue
-                if exc is not None:
-                    raise exc
-                resource = resource_future.result(
-                    timeout=self.configuration.concurrency.timeout
-                )
-                group_resources.update({resource_name: resource})
-            resources.update({group_name: group_resources})
+                resource_jobs.append((resource_meta["grafana"], resource_job))
+        concurrency = self.configuration.concurrency
+        results = await asyncio.gather(
+            *schedule(
+                resource_jobs,
+                concurrency.budget("refresh"),
+                concurrency.budgets("refresh"),
+            ),
+            return_exceptions=True,
+        )
+        resources: typing.Dict[str, typing.Dict[str, Resource]] = {
+            group_name: {} for group_name in resources_meta
+        }
+        for (group_name, resource_name), result in zip(resource_names, results):
+            if isinstance(result, gdbt.errors.GrafanaResourceNotFound):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            resources[group_name].update({resource_name: result})
         return typing.cast(typing.Dict[str, ResourceGroup], resources)
+
+    def load(
+        self,
+        resources_meta: typing.Mapping[str, ResourceGroupMeta],
+        resources_desired: typing.Optional[typing.Mapping[str, ResourceGroup]] = None,
+    ) -> typing.Dict[str, ResourceGroup]:
+        return run(self.load_async(resources_meta, resources_desired))
@@ -0,0 +1,214 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import random
+import time
+import typing
+
+import attr
+
+import gdbt.errors
+from gdbt.code import Configuration
+from gdbt.code.configuration import RetryConfiguration
+
+RETRY_DELAY_BASE = 0.5
+RETRY_DELAY_MAX = 10.0
+
+# Errors retried by each policy
+RETRY_POLICIES: typing.Dict[str, typing.Tuple[typing.Type[Exception], ...]] = {
+    # Writes, retried while Grafana is struggling
+    "write": (gdbt.errors.GrafanaServerError,),
+    # Reads of resources that have just been written and may not be visible yet
+    "read_after_write": (
+        gdbt.errors.GrafanaServerError,
+        gdbt.errors.GrafanaResourceNotFound,
+    ),
+    # Refresh reads, a missing resource is an answer and is not retried
+    "refresh": (gdbt.errors.GrafanaServerError,),
+}
+
+F = typing.TypeVar("F", bound=typing.Callable[..., typing.Awaitable[typing.Any]])
+
+# Errors retried by the calls enclosing the current one
+retried_enclosing: contextvars.ContextVar[
+    typing.Tuple[typing.Type[Exception], ...]
+] = contextvars.ContextVar("retried_enclosing", default=())
+
+
+@attr.s
+class RetryBudget:
+    """Retries allowed per provider for the run, refilled by a share of successful calls"""
+
+    capacity: float = attr.ib()
+    ratio: float = attr.ib()
+    tokens: float = attr.ib(init=False)
+
+    @tokens.default
+    def _tokens(self) -> float:
+        return self.capacity
+
+    def deposit(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@attr.s
+class CircuitBreaker:
+    threshold: int = attr.ib()
+    timeout: float = attr.ib()
+    failures: int = attr.ib(init=False, default=0)
+    opened: typing.Optional[float] = attr.ib(init=False, default=None)
+
+    def allow(self) -> bool:
+        if self.opened is None:
+            return True
+        if time.monotonic() - self.opened < self.timeout:
+            return False
+        # Half open: let one call through to probe the server
+        self.opened = time.monotonic()
+        return True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened = None
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.trip()
+
+    def trip(self) -> None:
+        self.opened = time.monotonic()
+
+
+@attr.s
+class Retrier:
+    configuration: RetryConfiguration = attr.ib()
+    budgets: typing.Dict[str, RetryBudget] = attr.ib(init=False, factory=dict)
+    breakers: typing.Dict[str, CircuitBreaker] = attr.ib(init=False, factory=dict)
+
+    @classmethod
+    def for_configuration(cls, configuration: Configuration) -> "Retrier":
+        # Retry state lives as long as the configuration, i.e. for the whole run
+        if not isinstance(configuration.retrier, cls):
+            configuration.retrier = cls(configuration.retry or RetryConfiguration())
+        return configuration.retrier
+
+    def budget(self, grafana: str) -> RetryBudget:
+        budget = self.budgets.get(grafana)
+        if budget is None:
+            budget = RetryBudget(
+                float(self.configuration.budget or 0),
+                self.configuration.budget_ratio or 0.0,
+            )
+            self.budgets.update({grafana: budget})
+        return budget
+
+    def breaker(self, grafana: str) -> CircuitBreaker:
+        breaker = self.breakers.get(grafana)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                self.configuration.breaker_threshold or 1,
+                self.configuration.breaker_timeout or 0.0,
+            )
+            self.breakers.update({grafana: breaker})
+        return breaker
+
+    def max_time(self, policy: str) -> float:
+        if policy == "refresh":
+            return self.configuration.refresh_max_time or 0.0
+        return self.configuration.max_time or 0.0
+
+    async def call(
+        self,
+        policy: str,
+        grafana: str,
+        function: typing.Callable[[], typing.Awaitable[typing.Any]],
+    ) -> typing.Any:
+        # Errors an enclosing call retries are left to it, so nested calls don't
+        # multiply delays or count one failure several times
+        enclosing = retried_enclosing.get()
+        retried = tuple(
+            error
+            for error in RETRY_POLICIES[policy]
+            if not issubclass(error, enclosing)
+        )
+        token = retried_enclosing.set(enclosing + retried)
+        try:
+            return await self._call(policy, grafana, function, retried, enclosing)
+        finally:
+            retried_enclosing.reset(token)
+
+    async def _call(
+        self,
+        policy: str,
+        grafana: str,
+        function: typing.Callable[[], typing.Awaitable[typing.Any]],
+        retried: typing.Tuple[typing.Type[Exception], ...],
+        enclosing: typing.Tuple[typing.Type[Exception], ...],
+    ) -> typing.Any:
+        budget = self.budget(grafana)
+        breaker = self.breaker(grafana)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise gdbt.errors.GrafanaCircuitOpen(grafana)
+            try:
+                result = await function()
+            except gdbt.errors.GrafanaCircuitOpen:
+                raise
+            except enclosing:
+                raise
+            except gdbt.errors.GrafanaError as exc:
+                server_error = isinstance(exc, gdbt.errors.GrafanaServerError)
+                if server_error:
+                    breaker.failure()
+                elif isinstance(exc, gdbt.errors.GrafanaResourceNotFound):
+                    breaker.success()
+                if not isinstance(exc, retried):
+                    raise
+                # Exponential backoff with full jitter
+                delay = random.uniform(
+                    0, min(RETRY_DELAY_MAX, RETRY_DELAY_BASE * 2**attempt)
+                )
+                if time.monotonic() - started + delay > self.max_time(policy):
+                    raise
+                # Only server errors draw from the budget, waiting for a written
+                # resource to become visible is bounded by max_time alone
+                if server_error and not budget.withdraw():
+                    breaker.trip()
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            breaker.success()
+            if not enclosing:
+                budget.deposit()
+            return result
+
+
+def retrying(policy: str) -> typing.Callable[[F], F]:
+    """Retry a resource coroutine by policy, per its grafana and configuration arguments"""
+
+    def decorator(function: F) -> F:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        async def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            arguments = signature.bind(*args, **kwargs).arguments
+            grafana = arguments.get("grafana") or arguments["self"].grafana
+            retrier = Retrier.for_configuration(arguments["configuration"])
+            return await retrier.call(
+                policy, grafana, functools.partial(function, *args, **kwargs)
+            )
+
+        return typing.cast(F, wrapper)
+
+    return decorator
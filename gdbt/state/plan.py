@@ -1,6 +1,7 @@
+import asyncio
 import collections
-import concurrent.futures
 import enum
+import functools
 import typing
 
 import attr
@@ -8,7 +9,9 @@ import dictdiffer  # type: ignore
 import flatten_dict  # type: ignore
 import rich.style
 
+import gdbt.errors
 from gdbt.code import Configuration
+from gdbt.provider.aio import run, schedule
 from gdbt.resource import Resource, ResourceGroup
 
 ACTION_SYMBOLS = {"CREATE": "+", "REMOVE": "-", "UPDATE": "~"}
@@ -291,6 +294,10 @@ class PlanRenderer:
 @attr.s
 class PlanRunner:
     summary: typing.Mapping[str, Plan.Outcome] = attr.ib()
+    # Results of the actions completed successfully, by resource name
+    applied: typing.Dict[str, typing.Optional[Resource]] = attr.ib(
+        init=False, factory=dict
+    )
 
     def resources(
         self,
@@ -313,15 +320,57 @@ class PlanRunner:
             resources.update({resource_name: resource})
         return resources
 
-    def apply(
+    def dependencies(
+        self,
+        resources_current: typing.Mapping[str, ResourceGroup],
+        resources_desired: typing.Mapping[str, ResourceGroup],
+    ) -> typing.Dict[str, typing.Set[str]]:
+        """Actions each action has to wait for, by resource name
+
+        Dashboards wait for their folder to be created, and a folder is removed
+        only after the dashboards leaving it are removed or moved away.
+        """
+        resources = self.resources(resources_current, resources_desired)
+        resources_current_flat = flatten_dict.flatten(
+            resources_current, reducer=lambda *x: x[-1]
+        )
+        folders = {}
+        for name, resource in resources.items():
+            outcome = self.summary[name]
+            if resource._kind == "folder":
+                folders.update({(resource.grafana, resource.uid, outcome): name})
+        dependencies: typing.Dict[str, typing.Set[str]] = {
+            name: set() for name in resources
+        }
+        for name, resource in resources.items():
+            outcome = self.summary[name]
+            if resource._kind != "dashboard":
+                continue
+            if outcome != Plan.Outcome.REMOVE:
+                folder = getattr(resource, "folder")
+                folder_created = folders.get(
+                    (resource.grafana, folder, Plan.Outcome.CREATE)
+                )
+                if folder_created:
+                    dependencies[name].add(folder_created)
+            if outcome == Plan.Outcome.CREATE:
+                continue
+            resource_current = resources_current_flat[name]
+            folder_removed = folders.get(
+                (resource_current.grafana, resource_current.folder, Plan.Outcome.REMOVE)
+            )
+            if folder_removed:
+                dependencies[folder_removed].add(name)
+        return dependencies
+
+    async def apply_async(
         self,
         configuration: Configuration,
         resources_current: typing.Mapping[str, ResourceGroup],
         resources_desired: typing.Mapping[str, ResourceGroup],
     ) -> None:
-        threads = configuration.concurrency.threads
-        pool = concurrent.futures.ThreadPoolExecutor(threads)
-        action_futures = []
+        actions = []
+        names = []
         resources = self.resources(resources_current, resources_desired)
         for name, resource in resources.items():
             outcome = self.summary[name]
@@ -329,24 +378,95 @@ class PlanRunner:
                 resource_serialized = resource.serialized
                 resource_serialized.pop("kind", None)
                 if outcome == Plan.Outcome.CREATE:
-                    future = pool.submit(
-                        resource.create,
+                    action = functools.partial(
+                        resource.create_async,
                         configuration=configuration,
                         **resource_serialized,
                     )
                 else:
-                    future = pool.submit(
-                        resource.update,
+                    action = functools.partial(
+                        resource.update_async,
                         configuration=configuration,
                         model=resource_serialized["model"],
                     )
-                action_futures.append(future)
+                actions.append((resource.grafana, action))
+                names.append(name)
             if outcome == Plan.Outcome.REMOVE:
-                future = pool.submit(resource.delete, configuration=configuration)  # type: ignore
-                action_futures.append(future)
-        results, _ = concurrent.futures.wait(
-            action_futures, timeout=configuration.concurrency.timeout
+                action = functools.partial(
+                    resource.delete_async, configuration=configuration
+                )
+                actions.append((resource.grafana, action))
+                names.append(name)
+        if not actions:
+            return
+        indices = {name: index for index, name in enumerate(names)}
+        dependencies = {
+            indices[name]: [indices[dependency] for dependency in dependencies]
+            for name, dependencies in self.dependencies(
+                resources_current, resources_desired
+            ).items()
+            if name in indices
+        }
+        concurrency = configuration.concurrency
+        tasks = schedule(
+            actions,
+            concurrency.budget("apply"),
+            concurrency.budgets("apply"),
+            dependencies,
         )
-        for result in results:
-            if result.exception() is not None:
-                raise result.exception()  # type: ignore
+        results, pending = await asyncio.wait(tasks, timeout=concurrency.timeout)
+        for task in pending:
+            task.cancel()
+        errors = []
+        for name, task in zip(names, tasks):
+            if task not in results:
+                continue
+            if task.exception() is not None:
+                errors.append(task.exception())
+                continue
+            self.applied.update({name: task.result()})
+        if errors:
+            raise errors[0]  # type: ignore
+        if pending:
+            raise gdbt.errors.GrafanaApplyTimeout(
+                f"{len(pending)} changes not applied in {concurrency.timeout} seconds"
+            )
+
+    def resources_applied(
+        self,
+        resources_current: typing.Mapping[str, ResourceGroup],
+        resources_desired: typing.Mapping[str, ResourceGroup],
+    ) -> typing.Dict[str, ResourceGroup]:
+        """Resources as they are in Grafana after applying, to be recorded in state
+
+        Resources whose action did not complete keep their current state.
+        """
+        resources: typing.Dict[str, ResourceGroup] = {}
+        for group_name in {*resources_current, *resources_desired}:
+            group_current: typing.Mapping[str, Resource] = resources_current.get(
+                group_name, {}
+            )
+            group_desired: typing.Mapping[str, Resource] = resources_desired.get(
+                group_name, {}
+            )
+            group = typing.cast(ResourceGroup, {})
+            for name in {*group_current, *group_desired}:
+                if name not in self.summary:
+                    resource = group_current.get(name) or group_desired.get(name)
+                elif name in self.applied:
+                    # None for removed resources
+                    resource = self.applied[name]
+                else:
+                    resource = group_current.get(name)
+                if resource is not None:
+                    group.update({name: resource})
+            resources.update({group_name: group})
+        return resources
+
+    def apply(
+        self,
+        configuration: Configuration,
+        resources_current: typing.Mapping[str, ResourceGroup],
+        resources_desired: typing.Mapping[str, ResourceGroup],
+    ) -> None:
+        run(self.apply_async(configuration, resources_current, resources_desired))
@@ -77,7 +77,9 @@ class StateLoader:
     ) -> typing.Dict[str, State]:
         if not path:
             path = pathlib.Path(".")
-        threads = self.configuration.concurrency.threads
+        threads = self.configuration.concurrency.budget(
+            "state", getattr(self.configuration.state, "provider", None)
+        )
         pool = concurrent.futures.ThreadPoolExecutor(threads)
         state_list = self.provider.list(str(path))
         states = {}
@@ -98,7 +100,9 @@ class StateLoader:
     def upload(
         self, path: pathlib.Path, resources: typing.Mapping[str, ResourceGroup]
     ) -> None:
-        threads = self.configuration.concurrency.threads
+        threads = self.configuration.concurrency.budget(
+            "state", getattr(self.configuration.state, "provider", None)
+        )
         pool = concurrent.futures.ThreadPoolExecutor(threads)
         state_futures = []
         for group_name, group_resources in resources.items():
@@ -117,8 +121,11 @@ class StateLoader:
                         "uid": resource.uid,
                         "grafana": resource.grafana,
                         "kind": resource._kind,
+                        "digest": resource.digest,
                     },
                 )
+                if resource.revision is not None:
+                    resource_meta.update({"version": str(resource.revision)})
                 group_meta.update({resource_name: resource_meta})
             state = State(group_meta, grafana, kind)
             state_future = pool.submit(state.push, group_name, self.provider)
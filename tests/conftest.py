@@ -0,0 +1,17 @@
+import pathlib
+import types
+import typing
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def user_cache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    path = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    return path
+
+
+@pytest.fixture
+def configuration() -> typing.Any:
+    return types.SimpleNamespace(providers={})
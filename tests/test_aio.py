@@ -0,0 +1,225 @@
+import asyncio
+import gzip
+import json
+import typing
+import zlib
+
+import pytest
+
+from gdbt.provider.aio import HTTPClient, HTTPConnectionStale
+
+
+class Server:
+    """Local HTTP server answering each request with canned raw bytes"""
+
+    def __init__(self, responses: typing.Dict[str, typing.List[bytes]]) -> None:
+        self.responses = responses
+        self.requests: typing.List[typing.Tuple[str, str, bytes]] = []
+        self.connections = 0
+        self.server: typing.Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        assert self.server is not None
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/grafana/api"
+
+    async def __aenter__(self) -> "Server":
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers.update({name.strip().lower(): value.strip()})
+                body = await reader.readexactly(int(headers["content-length"]))
+                self.requests.append((method, path, body))
+                response = self.responses[path].pop(0)
+                if response:
+                    writer.write(response)
+                    await writer.drain()
+                if not response or b"connection: close" in response.lower():
+                    break
+        finally:
+            writer.close()
+
+
+def response(body: bytes = b"{}", status: str = "200 OK", headers: str = "") -> bytes:
+    return (
+        f"HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\n{headers}\r\n".encode()
+        + body
+    )
+
+
+def run(coroutine: typing.Awaitable[typing.Any]) -> typing.Any:
+    return asyncio.run(asyncio.wait_for(coroutine, 10))
+
+
+def test_content_length() -> None:
+    async def main() -> None:
+        async with Server({"/grafana/api/a": [response(b'{"a": 1}')] * 2}) as server:
+            client = HTTPClient(server.url, timeout=5)
+            first = await client.request("GET", "/a")
+            second = await client.request("GET", "/a")
+            assert first.json() == second.json() == {"a": 1}
+            assert server.connections == 1
+
+    run(main())
+
+
+def test_chunked() -> None:
+    body = (
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b'4;ext=1\r\n{"a"\r\n5\r\n: [1,\r\n4\r\n 2]}\r\n0\r\nTrailer: x\r\n\r\n'
+    )
+
+    async def main() -> None:
+        async with Server({"/grafana/api/a": [body, response()]}) as server:
+            client = HTTPClient(server.url, timeout=5)
+            assert (await client.request("GET", "/a")).json() == {"a": [1, 2]}
+            # The connection is reused after the trailer
+            assert (await client.request("GET", "/a")).json() == {}
+            assert server.connections == 1
+
+    run(main())
+
+
+def test_close_delimited() -> None:
+    body = b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\n" + b"[1, 2, 3]" * 1000
+
+    async def main() -> None:
+        async with Server({"/grafana/api/a": [body, response()]}) as server:
+            client = HTTPClient(server.url, timeout=5)
+            data = (await client.request("GET", "/a")).body
+            assert data == b"[1, 2, 3]" * 1000
+            await client.request("GET", "/a")
+            assert server.connections == 2
+
+    run(main())
+
+
+def test_invalid_chunk_size() -> None:
+    body = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n"
+
+    async def main() -> None:
+        async with Server({"/grafana/api/a": [body]}) as server:
+            client = HTTPClient(server.url, timeout=5)
+            with pytest.raises(OSError):
+                await client.request("GET", "/a")
+
+    run(main())
+
+
+def test_empty_body() -> None:
+    async def main() -> None:
+        async with Server({"/grafana/api/a": [response(b"")]}) as server:
+            client = HTTPClient(server.url, timeout=5)
+            assert (await client.request("GET", "/a")).json() is None
+
+    run(main())
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    [
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("deflate", lambda data: zlib.compress(data)[2:-4]),
+    ],
+)
+def test_content_encoding(
+    encoding: str, compress: typing.Callable[[bytes], bytes]
+) -> None:
+    body = json.dumps({"panels": list(range(100))}).encode()
+    headers = f"Content-Encoding: {encoding}\r\n"
+
+    async def main() -> None:
+        async with Server(
+            {"/grafana/api/a": [response(compress(body), headers=headers)]}
+        ) as server:
+            client = HTTPClient(server.url, timeout=5)
+            assert (await client.request("GET", "/a")).body == body
+
+    run(main())
+
+
+def test_redirect_same_server() -> None:
+    async def main() -> None:
+        async with Server(
+            {
+                "/grafana/api/a": [
+                    response(status="301 Moved", headers="Location: /grafana/api/b\r\n")
+                ],
+                "/grafana/api/b": [
+                    response(status="307 Moved", headers="Location: c?x=1\r\n")
+                ],
+                "/grafana/api/c?x=1": [response(b'{"c": 1}')],
+            }
+        ) as server:
+            client = HTTPClient(server.url, timeout=5)
+            assert (await client.request("GET", "/a")).json() == {"c": 1}
+
+    run(main())
+
+
+def test_redirect_not_followed() -> None:
+    async def main() -> None:
+        async with Server(
+            {
+                "/grafana/api/a": [
+                    response(
+                        status="302 Found",
+                        headers="Location: https://grafana.example.com/api/a\r\n",
+                    )
+                ],
+                "/grafana/api/b": [
+                    response(status="302 Found", headers="Location: /grafana/api/c\r\n")
+                ],
+            }
+        ) as server:
+            client = HTTPClient(server.url, timeout=5)
+            # Another server
+            assert (await client.request("GET", "/a")).status == 302
+            # A write that would be turned into a GET
+            assert (await client.request("POST", "/b", {"a": 1})).status == 302
+
+    run(main())
+
+
+def test_stale_connection() -> None:
+    async def main() -> None:
+        async with Server(
+            {
+                "/grafana/api/a": [response(), b"", response()],
+                "/grafana/api/b": [response(), b""],
+            }
+        ) as server:
+            client = HTTPClient(server.url, timeout=5)
+            await client.request("GET", "/a")
+            # The server closes the idle connection, a GET is sent again
+            assert (await client.request("GET", "/a")).status == 200
+            assert server.connections == 2
+            await client.request("POST", "/b", {"a": 1})
+            with pytest.raises(HTTPConnectionStale):
+                await client.request("POST", "/b", {"a": 1})
+            assert [method for method, _, _ in server.requests].count("POST") == 2
+
+    run(main())
@@ -0,0 +1,60 @@
+import pathlib
+import time
+import types
+import typing
+
+import attr
+import pytest
+
+import gdbt.code  # noqa: F401 (gdbt.dynamic imports it back)
+from gdbt.dynamic import Evaluation, EvaluationEngine
+from gdbt.dynamic.cache import EvaluationCache, LocalEvaluationCacheBackend
+
+
+@attr.s
+class CountingEvaluation(Evaluation):
+    value: typing.Any = attr.ib(default=1)
+    calls: typing.List[str] = attr.ib(factory=list)
+
+    def evaluate(self, provider: typing.Any) -> typing.Any:
+        self.calls.append(provider.endpoint)
+        return self.value
+
+    @property
+    def hash(self) -> str:
+        return "query"
+
+
+def engine(
+    base: pathlib.Path, endpoint: str = "http://a", **kwargs: typing.Any
+) -> EvaluationEngine:
+    providers = {"p": types.SimpleNamespace(endpoint=endpoint, concurrency=None)}
+    return EvaluationEngine(typing.cast(typing.Any, providers), str(base), **kwargs)
+
+
+def test_cache_key_includes_endpoint(tmp_path: pathlib.Path) -> None:
+    cache = EvaluationCache(LocalEvaluationCacheBackend(str(tmp_path)))
+    evaluation = CountingEvaluation("p")
+    for base, endpoint in [("a", "http://a"), ("b", "http://a"), ("c", "http://b")]:
+        engine(tmp_path / base, endpoint, cache=cache).resolve({"t": {"e": evaluation}})
+    # The second checkout reuses the cached result of the same server only
+    assert evaluation.calls == ["http://a", "http://b"]
+
+
+def test_lock_time_is_not_committed(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    evaluation = CountingEvaluation("p")
+    lock = tmp_path / "t.lock"
+    engine(tmp_path, ttl=60).resolve({"t": {"e": evaluation}})
+    content = lock.read_text()
+    assert "time" not in content
+    # An expired result that has not changed leaves the lock as it is
+    now = time.time()
+    monkeypatch.setattr("time.time", lambda: now + 120)
+    assert engine(tmp_path, ttl=60).resolve({"t": {"e": evaluation}}) == {"t": {"e": 1}}
+    assert evaluation.calls == ["http://a"] * 2
+    assert lock.read_text() == content
+    # The evaluation time is still used for the expiry
+    engine(tmp_path, ttl=60).resolve({"t": {"e": evaluation}})
+    assert evaluation.calls == ["http://a"] * 2
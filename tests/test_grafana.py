@@ -0,0 +1,65 @@
+import asyncio
+import json
+import typing
+
+from gdbt.provider.aio import HTTPResponse
+from gdbt.provider.grafana import AsyncGrafanaAPI
+
+
+class FakeHTTP:
+    def __init__(self, data: typing.Dict[str, typing.Any]) -> None:
+        self.data = data
+        self.requests: typing.List[typing.Tuple[str, str]] = []
+
+    async def request(
+        self, method: str, path: str, json_data: typing.Any = None
+    ) -> HTTPResponse:
+        self.requests.append((method, path))
+        body = json.dumps(self.data.get(path, {})).encode()
+        return HTTPResponse(200, {}, body)
+
+
+def dashboard(uid: str, folder: typing.Optional[str]) -> typing.Dict[str, typing.Any]:
+    meta = {"folderId": 1}
+    if folder is not None:
+        meta.update({"folderUid": folder})
+    return {"dashboard": {"uid": uid, "panels": [{"id": 1}]}, "meta": meta}
+
+
+def test_reads_are_not_shared() -> None:
+    http = FakeHTTP({"/dashboards/uid/a": dashboard("a", "f")})
+    api = AsyncGrafanaAPI(typing.cast(typing.Any, http))
+
+    async def main() -> None:
+        first = await api.get_dashboard("a")
+        first["dashboard"]["panels"][0]["id"] = 2
+        second = await api.get_dashboard("a")
+        assert second["dashboard"]["panels"] == [{"id": 1}]
+
+    asyncio.run(main())
+    assert http.requests == [("GET", "/dashboards/uid/a")]
+
+
+def test_folder_write_evicts_its_dashboards() -> None:
+    http = FakeHTTP(
+        {
+            "/dashboards/uid/a": dashboard("a", "f"),
+            "/dashboards/uid/b": dashboard("b", "g"),
+            "/dashboards/uid/c": dashboard("c", None),
+        }
+    )
+    api = AsyncGrafanaAPI(typing.cast(typing.Any, http))
+
+    async def main() -> None:
+        for uid in "abc":
+            await api.get_dashboard(uid)
+        await api.delete_folder("f")
+        for uid in "abc":
+            await api.get_dashboard(uid)
+
+    asyncio.run(main())
+    reads = [path for method, path in http.requests if method == "GET"]
+    # The folder's dashboard and the one without a known folder are read again
+    assert reads.count("/dashboards/uid/a") == 2
+    assert reads.count("/dashboards/uid/b") == 1
+    assert reads.count("/dashboards/uid/c") == 2
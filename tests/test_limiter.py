@@ -0,0 +1,171 @@
+import asyncio
+import types
+import typing
+
+import pytest
+
+from gdbt.provider.aio import (
+    LIMIT_DECREASE,
+    LIMIT_INITIAL,
+    LIMIT_LATENCY_SAMPLES,
+    ConcurrencyLimiter,
+    HTTPClient,
+)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    # Only the limiter's clock is replaced, the event loop keeps the real one
+    monkeypatch.setattr(
+        "gdbt.provider.aio.time", types.SimpleNamespace(monotonic=clock)
+    )
+    return clock
+
+
+def requests(
+    limiter: ConcurrencyLimiter,
+    clock: Clock,
+    latency: float,
+    count: int = 1,
+    concurrent: int = 1,
+    overloaded: bool = False,
+) -> None:
+    """Send batches of concurrent requests that complete after latency"""
+
+    async def main() -> None:
+        for _ in range(count):
+            started = [await limiter.acquire() for _ in range(concurrent)]
+            clock.now += latency
+            for start in started:
+                limiter.release(start, overloaded=overloaded)
+
+    asyncio.run(main())
+
+
+def test_slow_start(clock: Clock) -> None:
+    limiter = ConcurrencyLimiter(maximum=20)
+    assert limiter.limit == LIMIT_INITIAL
+    requests(limiter, clock, 0.1, count=5)
+    # Each completed request raises the limit by one until the first congestion
+    assert limiter.limit == LIMIT_INITIAL + 5
+    requests(limiter, clock, 0.1, count=20)
+    assert limiter.limit == 20
+
+
+def test_single_slow_request(clock: Clock) -> None:
+    limiter = ConcurrencyLimiter(maximum=100)
+    requests(limiter, clock, 0.1, count=LIMIT_LATENCY_SAMPLES)
+    requests(limiter, clock, 2.0)
+    requests(limiter, clock, 0.1)
+    # A single slow request is no congestion signal
+    assert limiter.limit == LIMIT_INITIAL + LIMIT_LATENCY_SAMPLES + 2
+
+
+def test_backoff_on_sustained_latency_growth(clock: Clock) -> None:
+    limiter = ConcurrencyLimiter(maximum=100)
+    requests(limiter, clock, 0.1, count=LIMIT_LATENCY_SAMPLES)
+    # Most recent requests being slower is, the limit is decreased once for
+    # all requests completing within the same round trip
+    requests(limiter, clock, 2.0, concurrent=6)
+    limit = (LIMIT_INITIAL + LIMIT_LATENCY_SAMPLES + 2) * LIMIT_DECREASE
+    assert limiter.limit == pytest.approx(limit)
+    # And again a round trip later
+    requests(limiter, clock, 2.0)
+    limit *= LIMIT_DECREASE
+    assert limiter.limit == pytest.approx(limit)
+    # Without congestion the limit grows additively, not by slow start
+    requests(limiter, clock, 0.1, count=LIMIT_LATENCY_SAMPLES)
+    assert limit < limiter.limit < limit + 1
+
+
+def test_backoff_on_overload(clock: Clock) -> None:
+    limiter = ConcurrencyLimiter(maximum=100)
+    requests(limiter, clock, 0.1, concurrent=8, overloaded=True)
+    assert limiter.limit == pytest.approx(LIMIT_INITIAL * LIMIT_DECREASE)
+    assert limiter.inflight == 0
+
+
+def test_limit_is_not_below_one(clock: Clock) -> None:
+    limiter = ConcurrencyLimiter(maximum=100)
+    requests(limiter, clock, 1.0, count=20, overloaded=True)
+    assert limiter.limit == 1.0
+
+
+def client(
+    request: typing.Callable[..., typing.Awaitable[typing.Any]],
+    limit: int = 1,
+    adaptive: bool = False,
+) -> HTTPClient:
+    client = HTTPClient("http://127.0.0.1:1/api", limit=limit, adaptive=adaptive)
+    setattr(client, "_request", request)
+    return client
+
+
+def test_release_on_cancellation(clock: Clock) -> None:
+    async def main() -> None:
+        started = asyncio.Event()
+
+        async def hang(*args: typing.Any) -> None:
+            started.set()
+            await asyncio.Event().wait()
+
+        http = client(hang)
+        first = asyncio.ensure_future(http.request("GET", "/a"))
+        await started.wait()
+        second = asyncio.ensure_future(http.limiter.acquire())
+        await asyncio.sleep(0)
+        # The only slot is taken until the first request is cancelled
+        assert not second.done()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.wait_for(second, 1)
+        assert http.limiter.inflight == 1
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("error", [OSError, asyncio.TimeoutError, ValueError])
+def test_release_on_error(clock: Clock, error: typing.Type[Exception]) -> None:
+    async def fail(*args: typing.Any) -> None:
+        clock.now += 1.0
+        raise error()
+
+    async def main() -> None:
+        http = client(fail, limit=100, adaptive=True)
+        limit = http.limiter.limit
+        for _ in range(3):
+            with pytest.raises(error):
+                await http.request("GET", "/a")
+        assert http.limiter.inflight == 0
+        if error is ValueError:
+            # Failures that say nothing about the server don't change the limit
+            assert http.limiter.limit == limit
+        else:
+            assert http.limiter.limit < limit
+
+    asyncio.run(main())
+
+
+def test_release_on_cancelled_adaptive(clock: Clock) -> None:
+    limiter = ConcurrencyLimiter(maximum=100)
+
+    async def main() -> None:
+        started = await limiter.acquire()
+        clock.now += 30.0
+        limiter.release(started, completed=False)
+
+    asyncio.run(main())
+    # The time until cancellation is not a latency sample
+    assert limiter.inflight == 0
+    assert limiter.limit == LIMIT_INITIAL
+    assert limiter.latency is None
@@ -0,0 +1,68 @@
+import json
+import typing
+
+import pytest
+
+from gdbt.provider.prometheus import stream_results
+
+VECTOR = {
+    "status": "success",
+    "data": {
+        "resultType": "vector",
+        "result": [
+            {"metric": {"job": "api", "zone": "é-1"}, "value": [1700000000, "1"]},
+            {"metric": {"job": "db", "zone": "ü-2"}, "value": [1700000000, "2"]},
+        ],
+    },
+}
+MATRIX = {
+    "status": "success",
+    "data": {
+        "resultType": "matrix",
+        "result": [{"metric": {}, "values": [[1700000000, "1"], [1700000060, "2"]]}],
+    },
+}
+SCALAR = {"status": "success", "data": {"resultType": "scalar", "result": [1, "3"]}}
+EMPTY = {"status": "success", "data": {"resultType": "vector", "result": []}}
+ERROR = {"status": "error", "errorType": "bad_data", "error": "parse error"}
+
+
+def chunked(data: bytes, size: int) -> typing.List[bytes]:
+    chunks = []
+    for start in range(0, len(data), size):
+        end = start + size
+        chunks.append(data[start:end])
+    return chunks
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64 * 1024])
+@pytest.mark.parametrize(
+    "answer, results",
+    [
+        (VECTOR, VECTOR["data"]["result"]),
+        (MATRIX, MATRIX["data"]["result"]),
+        (SCALAR, [1, "3"]),
+        (EMPTY, []),
+        (ERROR, []),
+    ],
+)
+def test_stream_results(
+    answer: typing.Dict[str, typing.Any], results: typing.List[typing.Any], size: int
+) -> None:
+    # Multibyte characters are split between chunks with the smaller sizes
+    data = json.dumps(answer, ensure_ascii=False, indent=1).encode()
+    assert list(stream_results(chunked(data, size))) == results
+
+
+def test_stream_results_result_before_type() -> None:
+    data = b'{"data": {"result": [1, "3"], "resultType": "scalar"}}'
+    assert list(stream_results(chunked(data, 3))) == [1, "3"]
+
+
+@pytest.mark.parametrize("size", [1, 64 * 1024])
+def test_stream_results_truncated(size: int) -> None:
+    data = json.dumps(VECTOR).encode()[:-20]
+    results = stream_results(chunked(data, size))
+    assert next(results) == VECTOR["data"]["result"][0]
+    with pytest.raises(json.JSONDecodeError):
+        list(results)
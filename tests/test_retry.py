@@ -0,0 +1,72 @@
+import asyncio
+import typing
+
+import pytest
+
+import gdbt.errors
+from gdbt.code.configuration import RetryConfiguration
+from gdbt.resource.retry import Retrier
+
+
+@pytest.fixture(autouse=True)
+def no_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("gdbt.resource.retry.random.uniform", lambda a, b: 0.0)
+
+
+def failing(
+    errors: typing.List[Exception], calls: typing.List[str], name: str
+) -> typing.Callable[[], typing.Awaitable[str]]:
+    async def function() -> str:
+        calls.append(name)
+        if errors:
+            raise errors.pop(0)
+        return name
+
+    return function
+
+
+def test_nested_server_errors_are_retried_once() -> None:
+    retrier = Retrier(RetryConfiguration(budget=10, breaker_threshold=10))
+    errors: typing.List[Exception] = [gdbt.errors.GrafanaServerError("x")] * 2
+    calls: typing.List[str] = []
+    inner = failing(errors, calls, "inner")
+
+    async def outer() -> str:
+        calls.append("outer")
+        return await retrier.call("read_after_write", "g", inner)
+
+    assert asyncio.run(retrier.call("write", "g", outer)) == "inner"
+    # Only the outer call retries, each failure is counted once
+    assert calls == ["outer", "inner"] * 3
+    assert retrier.budget("g").tokens == 8 + 0.1
+
+
+def test_nested_visibility_wait() -> None:
+    retrier = Retrier(RetryConfiguration(budget=10))
+    errors: typing.List[Exception] = [gdbt.errors.GrafanaResourceNotFound("x")] * 2
+    calls: typing.List[str] = []
+    inner = failing(errors, calls, "inner")
+
+    async def outer() -> str:
+        calls.append("outer")
+        return await retrier.call("read_after_write", "g", inner)
+
+    assert asyncio.run(retrier.call("write", "g", outer)) == "inner"
+    # Missing resources are only retried by the inner call, within its policy
+    assert calls == ["outer", "inner", "inner", "inner"]
+    assert retrier.budget("g").tokens == 10
+
+
+def test_budget_per_provider() -> None:
+    retrier = Retrier(RetryConfiguration(budget=2, breaker_threshold=10))
+    calls: typing.List[str] = []
+
+    for grafana in ("a", "b"):
+        errors: typing.List[Exception] = [gdbt.errors.GrafanaServerError("x")] * 5
+        with pytest.raises(gdbt.errors.GrafanaServerError):
+            asyncio.run(retrier.call("write", grafana, failing(errors, calls, grafana)))
+    # Each provider spends its own budget
+    assert calls == ["a"] * 3 + ["b"] * 3
+    # Running out of budget opens the breaker of that provider only
+    assert not retrier.breaker("a").allow()
+    assert retrier.breaker("c").allow()
@@ -0,0 +1,137 @@
+import json
+import pathlib
+import typing
+
+import pytest
+
+from gdbt.code.cache import RenderCache
+from gdbt.code.templates import (
+    LOOP_DEPENDENT,
+    LOOP_ITEM_OUTPUT,
+    Folder,
+    Model,
+    StructuredModel,
+    loop_dependency,
+)
+
+LIBRARY = {
+    "base.j2": '{"title": "{% block title %}{% endblock %}", "tags": []}',
+    "title.j2": "{$ loop.item | upper $}",
+    "panels.j2": '{% macro panel(name) %}{"title": "{$ name $}"}{% endmacro %}',
+}
+
+ITEMS = ["a", "b", "c"]
+
+
+@pytest.fixture
+def base(tmp_path: pathlib.Path) -> str:
+    library = tmp_path / "config" / "macros"
+    library.mkdir(parents=True)
+    for name, source in LIBRARY.items():
+        (library / name).write_text(source)
+    return str(tmp_path / "config")
+
+
+def render_both(
+    model: Model, configuration: typing.Any
+) -> typing.Tuple[typing.List[str], typing.List[str]]:
+    rendered = [model.render({}, {}, configuration, item) for item in ITEMS]
+    rendered_items = list(model.render_items({}, {}, configuration, ITEMS))
+    return rendered, rendered_items
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        '{% extends "base.j2" %}{% block title %}'
+        "{% include 'title.j2' %}{% endblock %}",
+        '{"title": "{% include "title.j2" %}"}',
+        '{% import "panels.j2" as panels %}{"p": [{$ panels.panel(loop.item) $}]}',
+        '{% from "panels.j2" import panel with context %}{"p": [{$ panel("x") $}]}',
+        '{"title": "{% filter upper %}{$ loop.item $}{% endfilter %}"}',
+        '{"title": "{$ loop.item $}", "id": "{$ loop.item $}-x"}',
+    ],
+)
+def test_skeleton_matches_render(
+    base: str, configuration: typing.Any, template: str
+) -> None:
+    model = Model(template, base)
+    rendered, rendered_items = render_both(model, configuration)
+    assert rendered_items == rendered
+    for item in rendered_items:
+        assert "\0" not in item
+
+
+def test_extends_is_loop_dependent() -> None:
+    assert loop_dependency('{% extends "base.j2" %}') == LOOP_DEPENDENT
+    assert loop_dependency('{"title": "{$ loop.item $}"}') == LOOP_ITEM_OUTPUT
+
+
+def test_render_cache_depends_on_format(base: str, configuration: typing.Any) -> None:
+    cache = RenderCache(base)
+    model = "{$ {'title': loop.item} $}"
+    folder = Folder(
+        kind="folder", provider="g", loop=None, model=model, format="structured"
+    )
+    assert folder.render("f", {}, {}, configuration, ITEMS, cache) == [
+        (f"f:{item}", {"title": item}) for item in ITEMS
+    ]
+    # Rendered as JSON text the same source is not valid JSON
+    folder = Folder(kind="folder", provider="g", loop=None, model=model)
+    with pytest.raises(json.JSONDecodeError):
+        folder.render("f", {}, {}, configuration, ITEMS, cache)
+
+
+def render_full(
+    model: StructuredModel, node: typing.Any, context: typing.Dict[str, typing.Any]
+) -> typing.Any:
+    if isinstance(node, str):
+        return model._render_leaf(node, context)
+    if isinstance(node, dict):
+        return {
+            model._render_key(key, context): render_full(model, value, context)
+            for key, value in node.items()
+        }
+    if isinstance(node, list):
+        return [render_full(model, value, context) for value in node]
+    return node
+
+
+def containers(node: typing.Any) -> typing.Generator[int, None, None]:
+    if isinstance(node, (dict, list)):
+        yield id(node)
+        for value in node.values() if isinstance(node, dict) else node:
+            yield from containers(value)
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        {"{$ loop.item $}": {"title": "{$ loop.item | upper $}"}, "static": 1},
+        {"{$ lookups.key $}": "{$ loop.item $}", "panel-{$ loop.item $}": []},
+        {
+            "title": "{% if loop.item == 'a' %}first{% else %}other{% endif %}",
+            "hidden": "{$ loop.item != 'a' $}",
+            "tags": ["{% for tag in lookups.tags %}{$ tag $},{% endfor %}"],
+        },
+        {
+            "id": "{$ lookups.number $}",
+            "items": "{$ [loop.item, lookups.number, none] $}",
+            "nested": {"values": "{$ lookups.tags $}", "flag": True, "empty": None},
+            "list": [1, 2.5, "{$ loop.item * 2 $}", {"k": "{$ lookups.number $}"}],
+        },
+        {"static": {"nested": ["a", 1, None]}, "title": "{$ lookups.key $}"},
+    ],
+)
+def test_structured_fill_matches_render(
+    base: str, configuration: typing.Any, template: typing.Dict[str, typing.Any]
+) -> None:
+    lookups = {"key": "k", "number": 3, "tags": ["x", "y"]}
+    model = StructuredModel(template, base)
+    rendered_items = list(model.render_items({}, lookups, configuration, ITEMS))
+    for item, rendered in zip(ITEMS, rendered_items):
+        context = model._context({}, lookups, configuration, item)
+        assert rendered == render_full(model, template, context)
+    # Each item gets its own copy of the parts shared by all items
+    first, second = (set(containers(rendered)) for rendered in rendered_items[:2])
+    assert not first & second